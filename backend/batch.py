@@ -0,0 +1,339 @@
+import asyncio
+import io
+import json
+import os
+import zipfile
+from typing import AsyncIterator, Awaitable, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from backend.candidates import candidate_store
+from backend.job_analyzer import analyze_job_description_cached
+from backend.job_matcher import route_match
+from backend.llm_scheduler import BATCH, llm_priority
+from backend.prescreen import JobRequirements, passes_threshold, score_candidates
+from backend.parsers import MAX_UPLOAD_BYTES, SUPPORTED_EXTENSIONS, extract_text_from_bytes
+from backend.text_compaction import compact_resume_text
+from backend.resume_extractor import extract_resume_details_cached
+
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "500"))
+BATCH_MAX_FILE_BYTES = int(os.getenv("BATCH_MAX_FILE_BYTES", str(MAX_UPLOAD_BYTES)))
+
+
+def _file_extension(filename: str) -> str:
+    return filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+
+
+def expand_uploads(uploads: List[Tuple[str, bytes]]) -> List[Tuple[str, bytes]]:
+    """Flatten uploaded files, unpacking any zip archives into their resumes"""
+    files = []
+    for filename, data in uploads:
+        if _file_extension(filename) != 'zip':
+            files.append((filename, data))
+            continue
+        try:
+            with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                for info in archive.infolist():
+                    name = info.filename
+                    if info.is_dir() or name.startswith('__MACOSX/'):
+                        continue
+                    if _file_extension(name) not in SUPPORTED_EXTENSIONS:
+                        continue
+                    if info.file_size > BATCH_MAX_FILE_BYTES:
+                        files.append((name, b''))
+                        continue
+                    files.append((name, archive.read(info)))
+                    if len(files) > BATCH_MAX_FILES:
+                        break
+        except zipfile.BadZipFile:
+            raise HTTPException(status_code=400, detail=f"Invalid zip archive: {filename}")
+
+    if len(files) > BATCH_MAX_FILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many resumes in one batch (max {BATCH_MAX_FILES})."
+        )
+    return files
+
+
+def start_job_analysis(job_description: str) -> "asyncio.Task[dict]":
+    """Analyze the posting in the background: parsing, extraction and pre-screening
+    go ahead meanwhile, and only the LLM match steps await the result"""
+    async def analyze() -> dict:
+        job_analysis, _ = await analyze_job_description_cached(job_description)
+        return job_analysis
+    return asyncio.create_task(analyze())
+
+
+class PrescreenBatcher:
+    """Pre-screens resumes that finish extraction in the same event loop pass
+    with one vectorized ``score_candidates`` call"""
+
+    def __init__(self, requirements: JobRequirements):
+        self.requirements = requirements
+        self._pending: List[Tuple[dict, "asyncio.Future[dict]"]] = []
+
+    async def score(self, resume_details: dict) -> dict:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((resume_details, future))
+        if len(self._pending) == 1:
+            loop.call_soon(self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        pending, self._pending = self._pending, []
+        try:
+            scores = score_candidates(self.requirements, [details for details, _ in pending])
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), score in zip(pending, scores):
+            if not future.done():
+                future.set_result(score)
+
+
+async def match_candidate(
+    record: dict,
+    resume_details: dict,
+    prescreen: dict,
+    job_description: str,
+    prescreen_threshold: float = 0,
+    job_analysis: Optional[Awaitable[dict]] = None,
+) -> dict:
+    """Run the LLM match for pre-screened details if they pass.
+
+    Candidates whose local pre-screen score is below ``prescreen_threshold``
+    are reported as ``screened_out`` without the LLM match call. The job
+    analysis is only awaited once a match is needed.
+    """
+    record.update({"prescreen": prescreen, "resume_details": resume_details})
+    record.setdefault("cache", {})
+    if not passes_threshold(prescreen, prescreen_threshold):
+        record["status"] = "screened_out"
+        return record
+
+    match_result, match_hit, routing = await route_match(
+        resume_details, job_description,
+        await job_analysis if job_analysis is not None else None
+    )
+    if "error" in match_result:
+        raise HTTPException(
+            status_code=match_result.get("status_code", 500), detail=match_result["error"]
+        )
+
+    record["status"] = "ok"
+    record["match_analysis"] = match_result
+    record["routing"] = routing
+    record["cache"]["match_analysis"] = "hit" if match_hit else "miss"
+    return record
+
+
+async def screen_candidate(
+    index: int,
+    filename: str,
+    data: bytes,
+    job_description: str,
+    semaphore: asyncio.Semaphore,
+    prescreener: PrescreenBatcher,
+    prescreen_threshold: float = 0,
+    job_analysis: Optional[Awaitable[dict]] = None,
+) -> dict:
+    """Parse, extract and match one resume; errors are reported, not raised"""
+    # Runs in its own task, so this only queues this candidate's LLM calls
+    # behind interactive requests
+    llm_priority.set(BATCH)
+    record = {"type": "result", "index": index, "filename": filename}
+    try:
+        if _file_extension(filename) not in SUPPORTED_EXTENSIONS:
+            raise HTTPException(status_code=400, detail="Unsupported file format.")
+        if not data or len(data) > BATCH_MAX_FILE_BYTES:
+            raise HTTPException(status_code=400, detail="File is empty or too large.")
+
+        async with semaphore:
+            resume_text = await extract_text_from_bytes(data, _file_extension(filename))
+            if not resume_text or len(resume_text.strip()) < 10:
+                raise HTTPException(
+                    status_code=400,
+                    detail="Could not extract meaningful text from the file."
+                )
+
+            compact_text, record["compaction"] = compact_resume_text(resume_text)
+            resume_details, resume_hit = await extract_resume_details_cached(compact_text)
+            if "error" in resume_details:
+                raise HTTPException(
+                    status_code=resume_details.get("status_code", 500), detail=resume_details["error"]
+                )
+
+            record["candidate_id"] = await asyncio.to_thread(
+                candidate_store.save, resume_text, resume_details, filename
+            )
+            record["cache"] = {"resume_details": "hit" if resume_hit else "miss"}
+            await match_candidate(
+                record, resume_details, await prescreener.score(resume_details),
+                job_description, prescreen_threshold, job_analysis
+            )
+    except HTTPException as e:
+        record.update({"status": "error", "error": e.detail})
+    except Exception as e:
+        record.update({"status": "error", "error": str(e)})
+    return record
+
+
+async def rank_stored_candidate(
+    index: int,
+    candidate: dict,
+    prescreen: dict,
+    job_description: str,
+    semaphore: asyncio.Semaphore,
+    prescreen_threshold: float = 0,
+    job_analysis: Optional[Awaitable[dict]] = None,
+) -> dict:
+    """Match an already extracted, stored candidate; errors are reported, not raised"""
+    llm_priority.set(BATCH)
+    record = {
+        "type": "result",
+        "index": index,
+        "candidate_id": candidate["id"],
+        "filename": candidate["filename"],
+    }
+    try:
+        async with semaphore:
+            await match_candidate(
+                record, candidate["resume_details"], prescreen, job_description,
+                prescreen_threshold, job_analysis
+            )
+    except HTTPException as e:
+        record.update({"status": "error", "error": e.detail})
+    except Exception as e:
+        record.update({"status": "error", "error": str(e)})
+    return record
+
+
+def _ranking_entry(record: dict) -> dict:
+    match = record["match_analysis"]
+    contact = record["resume_details"].get("contact_info") or {}
+    return {
+        "index": record["index"],
+        "candidate_id": record.get("candidate_id"),
+        "filename": record["filename"],
+        "name": contact.get("name"),
+        "match_percentage": match.get("match_percentage"),
+        "verdict": match.get("verdict"),
+        "prescreen_score": record["prescreen"]["score"],
+        "tier": record["routing"]["final_tier"],
+    }
+
+
+def _score(entry: dict) -> float:
+    try:
+        return float(entry["match_percentage"])
+    except (TypeError, ValueError):
+        return -1.0
+
+
+async def stream_batch(
+    files: List[Tuple[str, bytes]], job_description: str, prescreen_threshold: float = 0
+) -> AsyncIterator[str]:
+    """Yield one NDJSON line per candidate as it finishes, then a ranked summary"""
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+    requirements = JobRequirements(job_description)
+    prescreener = PrescreenBatcher(requirements)
+    # Analyze the posting once, alongside parsing; every match then uses its
+    # compact requirements
+    job_analysis = start_job_analysis(job_description)
+    tasks = [
+        asyncio.create_task(screen_candidate(
+            i, name, data, job_description, semaphore, prescreener,
+            prescreen_threshold, job_analysis
+        ))
+        for i, (name, data) in enumerate(files)
+    ]
+    async for line in _stream_results(tasks, requirements, job_analysis):
+        yield line
+
+
+async def stream_rerank(
+    candidates: List[dict], job_description: str, prescreen_threshold: float = 0
+) -> AsyncIterator[str]:
+    """Re-rank stored candidates against a new job description, streamed as NDJSON"""
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+    requirements = JobRequirements(job_description)
+    job_analysis = start_job_analysis(job_description)
+    # Every stored candidate is pre-screened with one vectorized call
+    prescreens = score_candidates(requirements, [c["resume_details"] for c in candidates])
+    tasks = [
+        asyncio.create_task(rank_stored_candidate(
+            i, candidate, prescreen, job_description, semaphore,
+            prescreen_threshold, job_analysis
+        ))
+        for i, (candidate, prescreen) in enumerate(zip(candidates, prescreens))
+    ]
+    async for line in _stream_results(tasks, requirements, job_analysis):
+        yield line
+
+
+def summarize(
+    records: List[dict],
+    total: int,
+    requirements: JobRequirements,
+    job_analysis: Optional[dict] = None,
+) -> dict:
+    """Summary record ranking finished candidates by match percentage"""
+    ranking = []
+    screened_out = []
+    failed = 0
+    for record in records:
+        if record["status"] == "ok":
+            ranking.append(_ranking_entry(record))
+        elif record["status"] == "screened_out":
+            screened_out.append({
+                "index": record["index"],
+                "candidate_id": record.get("candidate_id"),
+                "filename": record["filename"],
+                "prescreen_score": record["prescreen"]["score"]
+            })
+        else:
+            failed += 1
+
+    ranking.sort(key=_score, reverse=True)
+    screened_out.sort(key=lambda entry: entry["prescreen_score"], reverse=True)
+    return {
+        "type": "summary",
+        "total": total,
+        "succeeded": len(ranking),
+        "full_matches": sum(1 for entry in ranking if entry["tier"] == "full"),
+        "screened_out": len(screened_out),
+        "failed": failed,
+        "requirements": requirements.terms,
+        "job_analysis": job_analysis if job_analysis and "error" not in job_analysis else None,
+        "ranking": ranking,
+        "screened_out_candidates": screened_out
+    }
+
+
+async def _stream_results(
+    tasks: List["asyncio.Task[dict]"],
+    requirements: JobRequirements,
+    job_analysis: "asyncio.Task[dict]",
+) -> AsyncIterator[str]:
+    """Emit task records in completion order, then the ranked summary"""
+    records = []
+    try:
+        for finished in asyncio.as_completed(tasks):
+            record = await finished
+            records.append(record)
+            yield json.dumps(record) + "\n"
+    except BaseException:
+        job_analysis.cancel()
+        raise
+    finally:
+        # Client went away: stop the remaining work
+        for task in tasks:
+            task.cancel()
+
+    summary = summarize(records, len(tasks), requirements, await job_analysis)
+    yield json.dumps(summary) + "\n"
@@ -0,0 +1,182 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from backend.metrics import CACHE_REQUESTS
+
+load_dotenv()
+
+CACHE_DIR = Path(os.getenv("CACHE_DIR", "cache"))
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace runs so cosmetic differences hash identically"""
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def content_hash(*parts: str) -> str:
+    """Stable SHA-256 over the given parts"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def canonical_json(value: Any) -> str:
+    """Key-sorted, minified JSON so equal documents serialize identically"""
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def prompt_version(prompt_path: str) -> str:
+    """Short hash of a prompt file, so editing the prompt invalidates entries"""
+    with open(prompt_path, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()[:12]
+
+
+class SqliteStore:
+    """Small key/value table of JSON documents that survives restarts"""
+
+    def __init__(self, path: Path, table: str):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.table = table
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str, ttl: Optional[float] = None) -> Optional[Tuple[Any, float]]:
+        """(value, created_at) of a live entry, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, created_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        if ttl is not None and time.time() - row[1] > ttl:
+            self.delete(key)
+            return None
+        return json.loads(row[0]), row[1]
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, created_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time()),
+            )
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class ResultCache:
+    """In-memory LRU with TTL, optionally backed by a SQLite store.
+
+    The SQLite tier is blocking I/O, so it is only touched from a worker thread.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: Optional[float] = None,
+                 store: Optional[SqliteStore] = None, name: str = "cache"):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self.store = store
+        self._entries: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, "asyncio.Task[Any]"] = {}
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl is not None and time.time() - created_at > self.ttl
+
+    def _get_memory(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if not self._expired(entry[0]):
+                    self._entries.move_to_end(key)
+                    return entry[1]
+                del self._entries[key]
+        return None
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = self._get_memory(key)
+        if value is not None or self.store is None:
+            return value
+        entry = await asyncio.to_thread(self.store.get, key, self.ttl)
+        if entry is None:
+            return None
+        value, created_at = entry
+        # Keep the stored age, so reloading an entry does not extend its TTL
+        self._remember(key, value, created_at)
+        return value
+
+    async def set(self, key: str, value: Any) -> None:
+        self._remember(key, value)
+        if self.store is not None:
+            await asyncio.to_thread(self.store.set, key, value)
+
+    async def get_or_create(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable[Any]],
+        cacheable: Callable[[Any], bool] = lambda value: True,
+    ) -> Tuple[Any, bool]:
+        """Return the cached value or compute it once.
+
+        Concurrent callers with the same key share a single in-flight call to
+        ``factory``. Returns the value and whether this caller avoided an
+        upstream call (cache hit or joined an in-flight computation).
+        """
+        value = await self.get(key)
+        if value is not None:
+            CACHE_REQUESTS.inc(cache=self.name, result="hit")
+            return value, True
+
+        task = self._inflight.get(key)
+        if task is not None:
+            CACHE_REQUESTS.inc(cache=self.name, result="coalesced")
+            return await asyncio.shield(task), True
+
+        async def compute() -> Any:
+            result = await factory()
+            if cacheable(result):
+                await self.set(key, result)
+            return result
+
+        CACHE_REQUESTS.inc(cache=self.name, result="miss")
+        task = asyncio.ensure_future(compute())
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded so one disconnecting client does not cancel the other waiters
+        return await asyncio.shield(task), False
+
+    def _remember(self, key: str, value: Any, created_at: Optional[float] = None) -> None:
+        with self._lock:
+            self._entries[key] = (time.time() if created_at is None else created_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
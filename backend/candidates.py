@@ -0,0 +1,141 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from dotenv import load_dotenv
+
+from backend.cache import content_hash, normalize_text
+
+load_dotenv()
+
+CANDIDATE_DB = Path(os.getenv("CANDIDATE_DB", "data/candidates.db"))
+
+
+def resume_content_hash(resume_text: str) -> str:
+    """Identity of a resume document, independent of model or prompt"""
+    return content_hash(normalize_text(resume_text))
+
+
+class CandidateStore:
+    """Extracted resumes kept across screenings so they can be re-ranked later"""
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS candidates ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "content_hash TEXT NOT NULL UNIQUE, "
+            "filename TEXT, "
+            "name TEXT, "
+            "email TEXT, "
+            "resume_details TEXT NOT NULL, "
+            "created_at REAL NOT NULL, "
+            "updated_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def subscribe(self, listener) -> None:
+        """Register an index with ``add(id, details)``/``remove(id)`` kept in sync"""
+        self._listeners.append(listener)
+
+    def save(self, resume_text: str, resume_details: dict,
+             filename: Optional[str] = None) -> int:
+        """Insert or refresh a candidate; returns its id"""
+        contact = resume_details.get("contact_info") or {}
+        doc_hash = resume_content_hash(resume_text)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO candidates "
+                "(content_hash, filename, name, email, resume_details, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(content_hash) DO UPDATE SET "
+                "filename = COALESCE(excluded.filename, filename), "
+                "name = excluded.name, email = excluded.email, "
+                "resume_details = excluded.resume_details, updated_at = excluded.updated_at",
+                (
+                    doc_hash,
+                    filename,
+                    contact.get("name"),
+                    contact.get("email"),
+                    json.dumps(resume_details),
+                    now,
+                    now,
+                ),
+            )
+            self._conn.commit()
+            row = self._conn.execute(
+                "SELECT id FROM candidates WHERE content_hash = ?", (doc_hash,)
+            ).fetchone()
+        for listener in self._listeners:
+            listener.add(row["id"], resume_details)
+        return row["id"]
+
+    def get(self, candidate_id: int) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM candidates WHERE id = ?", (candidate_id,)
+            ).fetchone()
+        return self._to_dict(row) if row else None
+
+    def list(self, candidate_ids: Optional[List[int]] = None,
+             updated_since: Optional[float] = None,
+             limit: Optional[int] = None,
+             include_details: bool = False) -> List[dict]:
+        """Stored candidates, newest first, optionally filtered"""
+        query = "SELECT * FROM candidates"
+        clauses, params = [], []
+        if candidate_ids:
+            clauses.append(f"id IN ({','.join('?' * len(candidate_ids))})")
+            params.extend(candidate_ids)
+        if updated_since is not None:
+            clauses.append("updated_at >= ?")
+            params.append(updated_since)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY updated_at DESC"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [self._to_dict(row, include_details) for row in rows]
+
+    def delete(self, candidate_id: int) -> bool:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM candidates WHERE id = ?", (candidate_id,))
+            self._conn.commit()
+        for listener in self._listeners:
+            listener.remove(candidate_id)
+        return cursor.rowcount > 0
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row, include_details: bool = True) -> dict:
+        candidate = {
+            "id": row["id"],
+            "content_hash": row["content_hash"],
+            "filename": row["filename"],
+            "name": row["name"],
+            "email": row["email"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+        }
+        if include_details:
+            candidate["resume_details"] = json.loads(row["resume_details"])
+        return candidate
+
+
+candidate_store = CandidateStore(CANDIDATE_DB)
@@ -0,0 +1,69 @@
+import os
+from typing import Tuple
+
+from backend.cache import (
+    CACHE_DIR, ResultCache, SqliteStore, content_hash, normalize_text, prompt_version
+)
+from backend.llm_scheduler import llm_error
+from backend.metrics import STAGE_SECONDS
+from backend.models import JobAnalysis
+from backend.structured_output import StructuredOutputError, complete_structured
+
+JOB_ANALYSIS_MODEL = "llama-3.1-8b-instant"
+JOB_ANALYSIS_PROMPT_PATH = "./prompts/analyze_job.txt"
+
+job_analysis_cache = ResultCache(
+    max_size=int(os.getenv("JOB_ANALYSIS_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("JOB_ANALYSIS_CACHE_TTL", str(7 * 24 * 3600))),
+    store=SqliteStore(CACHE_DIR / "cache.db", "job_analysis")
+    if os.getenv("JOB_ANALYSIS_CACHE_PERSIST", "1") == "1" else None,
+    name="job_analysis",
+)
+
+def job_analysis_cache_key(job_description: str) -> str:
+    """Cache key for a job description: normalized text + model + prompt version"""
+    return content_hash(
+        normalize_text(job_description),
+        JOB_ANALYSIS_MODEL,
+        prompt_version(JOB_ANALYSIS_PROMPT_PATH),
+    )
+
+async def analyze_job_description_cached(job_description: str) -> Tuple[dict, bool]:
+    """Structured requirements for a job description, analyzed once per posting.
+
+    Returns the requirements and whether they came from the cache.
+    """
+    return await job_analysis_cache.get_or_create(
+        job_analysis_cache_key(job_description),
+        lambda: analyze_job_description(job_description),
+        cacheable=lambda analysis: "error" not in analysis,
+    )
+
+async def analyze_job_description(job_description: str) -> dict:
+    """Extract must-have/nice-to-have skills, experience and education from a posting"""
+    try:
+        with open(JOB_ANALYSIS_PROMPT_PATH, "r") as file:
+            prompt = file.read()
+
+        with STAGE_SECONDS.time(stage="job_analysis_llm"):
+            return await complete_structured(
+                JobAnalysis,
+                messages=[
+                    {"role": "system", "content": prompt},
+                    {
+                        "role": "user",
+                        "content": f"Extract the requirements from this job description:\n\n{job_description}"
+                    }
+                ],
+                model=JOB_ANALYSIS_MODEL,
+                temperature=0.1,
+                max_tokens=1000,
+            )
+
+    except StructuredOutputError as e:
+        print(f"Error parsing JSON: {e}")
+        return {"error": "Failed to parse job description", "raw_response": e.raw}
+
+    except Exception as e:
+        print(f"Error analyzing job description: {e}")
+        return llm_error(e)
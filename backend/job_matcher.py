@@ -1,58 +1,252 @@
 import os
-import json
-from openai import OpenAI
-from dotenv import load_dotenv
+import time
+from typing import Any, AsyncIterator, List, Optional, Tuple, Type
 
-load_dotenv()
+from pydantic import BaseModel
 
-client = OpenAI(
-    api_key=os.getenv("GROQ_API_KEY"),
-    base_url="https://api.groq.com/openai/v1",
-    timeout=60.0, 
+from backend.cache import (
+    CACHE_DIR, ResultCache, SqliteStore, canonical_json, content_hash,
+    normalize_text, prompt_version
 )
+from backend.llm_scheduler import llm_error, stream_chat_completion
+from backend.metrics import CACHE_REQUESTS, STAGE_SECONDS
+from backend.models import MatchResult, TriageResult
+from backend.resume_payload import canonical_resume_json, prune_empty
+from backend.streaming_json import IncrementalObjectParser
+from backend.structured_output import (
+    StructuredOutputError, complete_structured, parse_structured
+)
+
+MATCH_MODEL = "llama-3.3-70b-versatile"
+MATCH_PROMPT_PATH = "./prompts/match_job.txt"
+
+# Two-tier routing: the fast model scores every candidate and only those at or
+# above TRIAGE_THRESHOLD (or within TRIAGE_MARGIN below it) get the full match.
+# A threshold of 0 sends every candidate straight to MATCH_MODEL.
+TRIAGE_MODEL = "llama-3.1-8b-instant"
+TRIAGE_PROMPT_PATH = "./prompts/triage_match.txt"
+TRIAGE_THRESHOLD = float(os.getenv("TRIAGE_THRESHOLD", "0"))
+TRIAGE_MARGIN = float(os.getenv("TRIAGE_MARGIN", "10"))
+
+match_cache = ResultCache(
+    max_size=int(os.getenv("MATCH_CACHE_SIZE", "4096")),
+    ttl=float(os.getenv("MATCH_CACHE_TTL", str(7 * 24 * 3600))),
+    store=SqliteStore(CACHE_DIR / "cache.db", "match_results")
+    if os.getenv("MATCH_CACHE_PERSIST", "1") == "1" else None,
+    name="match_results",
+)
+
+triage_cache = ResultCache(
+    max_size=int(os.getenv("MATCH_CACHE_SIZE", "4096")),
+    ttl=float(os.getenv("MATCH_CACHE_TTL", str(7 * 24 * 3600))),
+    store=SqliteStore(CACHE_DIR / "cache.db", "triage_results")
+    if os.getenv("MATCH_CACHE_PERSIST", "1") == "1" else None,
+    name="triage_results",
+)
+
+def job_payload(job_description: str, job_analysis: Optional[dict] = None) -> Tuple[str, str]:
+    """Label and text describing the job in the match prompt.
 
-def match_resume_to_job(resume_details: dict, job_description: str) -> dict:
-    """Compare resume details with job description"""
+    Structured requirements from the JD analysis are much shorter than the
+    posting itself; the raw text is used when no (valid) analysis is available.
+    """
+    if job_analysis and "error" not in job_analysis:
+        return "JOB REQUIREMENTS", canonical_json(prune_empty(job_analysis))
+    return "JOB DESCRIPTION", job_description
+
+def match_cache_key(
+    resume_details: dict,
+    job_description: str,
+    job_analysis: Optional[dict] = None,
+    model: str = MATCH_MODEL,
+    prompt_path: str = MATCH_PROMPT_PATH,
+) -> str:
+    """Cache key for a match: compact resume payload + job payload + model + prompt version"""
+    label, job_text = job_payload(job_description, job_analysis)
+    return content_hash(
+        content_hash(canonical_resume_json(resume_details, job_description)),
+        content_hash(label, normalize_text(job_text)),
+        model,
+        prompt_version(prompt_path),
+    )
+
+async def match_resume_to_job_cached(
+    resume_details: dict, job_description: str, job_analysis: Optional[dict] = None
+) -> Tuple[dict, bool]:
+    """Match a resume to a job, reusing earlier results for the same inputs.
+
+    Identical concurrent requests share one upstream call. Returns the
+    result and whether it was served without a new LLM call.
+    """
+    return await match_cache.get_or_create(
+        match_cache_key(resume_details, job_description, job_analysis),
+        lambda: match_resume_to_job(resume_details, job_description, job_analysis),
+        cacheable=lambda result: "error" not in result,
+    )
+
+async def triage_resume_cached(
+    resume_details: dict, job_description: str, job_analysis: Optional[dict] = None
+) -> Tuple[dict, bool]:
+    """Preliminary score from the fast model, cached like the full match"""
+    return await triage_cache.get_or_create(
+        match_cache_key(
+            resume_details, job_description, job_analysis, TRIAGE_MODEL, TRIAGE_PROMPT_PATH
+        ),
+        lambda: match_resume_to_job(
+            resume_details, job_description, job_analysis,
+            TRIAGE_MODEL, TRIAGE_PROMPT_PATH, max_tokens=300, result_model=TriageResult
+        ),
+        cacheable=lambda result: "error" not in result,
+    )
+
+def _triage_score(result: dict) -> Optional[float]:
     try:
-        with open("./prompts/match_job.txt", "r") as file:
-            prompt = file.read()
-        
-        comparison_text = f"""
+        return float(result["match_percentage"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+async def route_match(
+    resume_details: dict,
+    job_description: str,
+    job_analysis: Optional[dict] = None,
+    triage_threshold: float = TRIAGE_THRESHOLD,
+    triage_margin: float = TRIAGE_MARGIN,
+) -> Tuple[dict, bool, dict]:
+    """Match through the two-tier routing policy.
+
+    Returns the final result, whether it came from the cache, and the routing
+    decision with per-tier model, latency and cache status. A failed or
+    unparsable triage is escalated rather than trusted.
+    """
+    routing = {"escalated": False, "tiers": {}}
+    if triage_threshold > 0:
+        start = time.perf_counter()
+        triage, triage_hit = await triage_resume_cached(
+            resume_details, job_description, job_analysis
+        )
+        score = _triage_score(triage)
+        routing["tiers"]["triage"] = {
+            "model": TRIAGE_MODEL,
+            "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+            "cache": "hit" if triage_hit else "miss",
+        }
+        routing.update({
+            "triage_score": score,
+            "threshold": triage_threshold,
+            "margin": triage_margin,
+        })
+        if score is not None and score < triage_threshold - triage_margin:
+            routing["final_tier"] = "triage"
+            return triage, triage_hit, routing
+        routing["escalated"] = True
+
+    start = time.perf_counter()
+    result, match_hit = await match_resume_to_job_cached(
+        resume_details, job_description, job_analysis
+    )
+    routing["tiers"]["full"] = {
+        "model": MATCH_MODEL,
+        "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+        "cache": "hit" if match_hit else "miss",
+    }
+    routing["final_tier"] = "full"
+    return result, match_hit, routing
+
+def _match_messages(
+    resume_details: dict,
+    job_description: str,
+    job_analysis: Optional[dict],
+    prompt_path: str,
+) -> List[dict]:
+    with open(prompt_path, "r") as file:
+        prompt = file.read()
+    
+    label, job_text = job_payload(job_description, job_analysis)
+    comparison_text = f"""
         RESUME DETAILS:
-        {json.dumps(resume_details, indent=2)}
+        {canonical_resume_json(resume_details, job_description)}
 
-        JOB DESCRIPTION:
-        {job_description}
+        {label}:
+        {job_text}
 
         Analyze how well this resume matches the job description.
         """
-        
-        response = client.chat.completions.create(
-            messages=[
-                {"role": "system", "content": prompt},
-                {"role": "user", "content": comparison_text}
-            ],
-            model="llama-3.3-70b-versatile",
-            temperature=0.2,
-        )
-        
-        match_text = response.choices[0].message.content.strip()
-        
-        # Clean markdown formatting
-        if match_text.startswith("```json"):
-            match_text = match_text[7:]
-        if match_text.startswith("```"):
-            match_text = match_text[3:]
-        if match_text.endswith("```"):
-            match_text = match_text[:-3]
-        
-        match_result = json.loads(match_text.strip())
-        return match_result
+    return [
+        {"role": "system", "content": prompt},
+        {"role": "user", "content": comparison_text}
+    ]
+
+async def match_resume_to_job(
+    resume_details: dict,
+    job_description: str,
+    job_analysis: Optional[dict] = None,
+    model: str = MATCH_MODEL,
+    prompt_path: str = MATCH_PROMPT_PATH,
+    max_tokens: int = 2000,
+    result_model: Type[BaseModel] = MatchResult,
+) -> dict:
+    """Compare resume details with job description (or its analyzed requirements)"""
+    stage = "triage_llm" if result_model is TriageResult else "match_llm"
+    try:
+        with STAGE_SECONDS.time(stage=stage):
+            return await complete_structured(
+                result_model,
+                messages=_match_messages(resume_details, job_description, job_analysis, prompt_path),
+                model=model,
+                temperature=0.2,
+                max_tokens=max_tokens,
+            )
     
-    except json.JSONDecodeError as e:
+    except StructuredOutputError as e:
         print(f"Error parsing JSON: {e}")
-        return {"error": "Failed to parse match result", "raw_response": match_text}
+        return {"error": "Failed to parse match result", "raw_response": e.raw}
     
     except Exception as e:
         print(f"Error matching resume to job: {e}")
-        return {"error": str(e)}
\ No newline at end of file
+        return llm_error(e)
+
+async def stream_match_resume_to_job(
+    resume_details: dict, job_description: str, job_analysis: Optional[dict] = None
+) -> AsyncIterator[Tuple[str, Any]]:
+    """Full match, yielding each top-level field as soon as the model completes it.
+
+    Yields ``("field", (name, value))`` pairs and finally
+    ``("result", (match, cache_hit))`` or ``("error", error)``. Cached results are replayed at once, and a
+    finished stream is stored in the match cache for later requests.
+    """
+    key = match_cache_key(resume_details, job_description, job_analysis)
+    cached = await match_cache.get(key)
+    CACHE_REQUESTS.inc(cache=match_cache.name, result="miss" if cached is None else "hit")
+    if cached is not None:
+        for field in cached.items():
+            yield "field", field
+        yield "result", (cached, True)
+        return
+    
+    parser = IncrementalObjectParser()
+    start = time.perf_counter()
+    try:
+        async for delta in stream_chat_completion(
+            messages=_match_messages(
+                resume_details, job_description, job_analysis, MATCH_PROMPT_PATH
+            ),
+            model=MATCH_MODEL,
+            temperature=0.2,
+            max_tokens=2000,
+        ):
+            for field in parser.feed(delta):
+                yield "field", field
+    except Exception as e:
+        print(f"Error matching resume to job: {e}")
+        yield "error", llm_error(e)
+        return
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage="match_llm")
+    
+    # Validate the finished object; a cut-off or off-schema one is an error
+    match_result = parse_structured(parser.buffer or parser.raw, MatchResult)
+    if match_result is None:
+        yield "error", {"error": "Failed to parse match result", "raw_response": parser.raw}
+        return
+    await match_cache.set(key, match_result)
+    yield "result", (match_result, False)
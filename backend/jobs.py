@@ -0,0 +1,351 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from dotenv import load_dotenv
+
+from backend.batch import (
+    BATCH_CONCURRENCY, PrescreenBatcher, screen_candidate, start_job_analysis, summarize
+)
+from backend.prescreen import JobRequirements
+
+load_dotenv()
+
+JOB_DB = Path(os.getenv("JOB_DB", "data/jobs.db"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+
+# Seconds between queue polls when no job was submitted, and between SSE keep-alives
+_POLL_INTERVAL = 5.0
+_KEEPALIVE_INTERVAL = 15.0
+
+def sse_event(event: str, data: dict) -> str:
+    """One server-sent event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class JobQueue:
+    """Screening jobs kept in SQLite and worked through by in-process async workers.
+
+    Uploaded files and each candidate's result are stored as they complete,
+    so a job interrupted by a restart is picked up again and only the
+    candidates without a successful result are re-run.
+    """
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, "
+            "idempotency_key TEXT UNIQUE, "
+            "status TEXT NOT NULL, "
+            "job_description TEXT NOT NULL, "
+            "prescreen_threshold REAL NOT NULL, "
+            "total INTEGER NOT NULL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, "
+            "error TEXT, "
+            "summary TEXT, "
+            "created_at REAL NOT NULL, "
+            "updated_at REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS job_files ("
+            "job_id TEXT NOT NULL, idx INTEGER NOT NULL, filename TEXT NOT NULL, "
+            "data BLOB NOT NULL, PRIMARY KEY (job_id, idx));"
+            "CREATE TABLE IF NOT EXISTS job_results ("
+            "job_id TEXT NOT NULL, idx INTEGER NOT NULL, status TEXT NOT NULL, "
+            "record TEXT NOT NULL, PRIMARY KEY (job_id, idx));"
+        )
+        self._conn.commit()
+        self._workers: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+    # Submission and status
+
+    async def submit(self, files: List[Tuple[str, bytes]], job_description: str,
+                     prescreen_threshold: float = 0,
+                     idempotency_key: Optional[str] = None) -> dict:
+        """Queue a screening job; resubmitting with the same key returns the existing job"""
+        # Storing the uploaded files is blocking I/O, so keep it off the event loop
+        job_id = await asyncio.to_thread(
+            self._insert, files, job_description, prescreen_threshold, idempotency_key
+        )
+        self._notify()
+        return await asyncio.to_thread(self.get, job_id)
+
+    def _insert(self, files: List[Tuple[str, bytes]], job_description: str,
+                prescreen_threshold: float, idempotency_key: Optional[str]) -> str:
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            if idempotency_key:
+                row = self._conn.execute(
+                    "SELECT id FROM jobs WHERE idempotency_key = ?", (idempotency_key,)
+                ).fetchone()
+                if row is not None:
+                    job_id = row["id"]
+                    files = []
+            if files:
+                self._conn.execute(
+                    "INSERT INTO jobs (id, idempotency_key, status, job_description, "
+                    "prescreen_threshold, total, created_at, updated_at) "
+                    "VALUES (?, ?, 'queued', ?, ?, ?, ?, ?)",
+                    (job_id, idempotency_key, job_description, prescreen_threshold,
+                     len(files), now, now),
+                )
+                self._conn.executemany(
+                    "INSERT INTO job_files (job_id, idx, filename, data) VALUES (?, ?, ?, ?)",
+                    [(job_id, i, name, data) for i, (name, data) in enumerate(files)],
+                )
+                self._conn.commit()
+        return job_id
+
+    def get(self, job_id: str, include_results: bool = False) -> Optional[dict]:
+        """Status and counters of a job, plus every stored record if ``include_results``"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            completed = self._conn.execute(
+                "SELECT COUNT(*) FROM job_results WHERE job_id = ?", (job_id,)
+            ).fetchone()[0]
+        job = {
+            "job_id": row["id"],
+            "status": row["status"],
+            "total": row["total"],
+            "completed": completed,
+            "attempts": row["attempts"],
+            "error": row["error"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+            "summary": json.loads(row["summary"]) if row["summary"] else None,
+        }
+        if include_results:
+            job["results"] = self.results(job_id)
+        return job
+
+    def results(self, job_id: str) -> List[dict]:
+        """Candidate records stored so far, in completion order"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT record FROM job_results WHERE job_id = ? ORDER BY rowid", (job_id,)
+            ).fetchall()
+        return [json.loads(row["record"]) for row in rows]
+
+    async def retry(self, job_id: str) -> Optional[dict]:
+        """Re-queue a finished job; only its failed candidates are run again"""
+        await asyncio.to_thread(self._requeue, job_id)
+        self._notify()
+        return await asyncio.to_thread(self.get, job_id)
+
+    def _requeue(self, job_id: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'queued', attempts = 0, error = NULL, updated_at = ? "
+                "WHERE id = ? AND status IN ('done', 'failed') AND EXISTS "
+                "(SELECT 1 FROM job_files WHERE job_id = jobs.id)",
+                (time.time(), job_id),
+            )
+            self._conn.commit()
+
+    # Workers
+
+    async def start(self, workers: int = JOB_WORKERS) -> None:
+        """Re-queue jobs interrupted by a shutdown and start the workers.
+
+        A job that was interrupted on its last allowed attempt is failed
+        instead, so one that keeps crashing the process is not retried forever.
+        """
+        await asyncio.to_thread(self._recover)
+        self._wakeup = asyncio.Event()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(workers)]
+
+    def _recover(self) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, updated_at = ? "
+                "WHERE status = 'running' AND attempts >= ?",
+                (f"Interrupted on each of {JOB_MAX_ATTEMPTS} attempts", time.time(),
+                 JOB_MAX_ATTEMPTS),
+            )
+            self._conn.execute("UPDATE jobs SET status = 'queued' WHERE status = 'running'")
+            self._conn.commit()
+
+    async def stop(self) -> None:
+        # Running jobs stay "running" in the database and are re-queued on start
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def _notify(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _claim(self) -> Optional[sqlite3.Row]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, updated_at = ? "
+                "WHERE id = ?",
+                (time.time(), row["id"]),
+            )
+            self._conn.commit()
+        return row
+
+    async def _worker(self) -> None:
+        while True:
+            job = await asyncio.to_thread(self._claim)
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), _POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            try:
+                await self._run(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error running job {job['id']}: {e}")
+                await self._fail_or_requeue(job, str(e))
+
+    async def _run(self, job: sqlite3.Row) -> None:
+        job_id = job["id"]
+        job_description = job["job_description"]
+        self._publish(job_id, "status", {"job_id": job_id, "status": "running"})
+        pending = await asyncio.to_thread(self._pending, job_id)
+
+        requirements = JobRequirements(job_description)
+        prescreener = PrescreenBatcher(requirements)
+        job_analysis = start_job_analysis(job_description)
+        semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+        tasks = [
+            asyncio.create_task(screen_candidate(
+                row["idx"], row["filename"], row["data"], job_description, semaphore,
+                prescreener, job["prescreen_threshold"], job_analysis
+            ))
+            for row in pending
+        ]
+        del pending
+        try:
+            for finished in asyncio.as_completed(tasks):
+                record = await finished
+                await asyncio.to_thread(self._save_result, job_id, record)
+                self._publish(job_id, "result", record)
+        except BaseException:
+            job_analysis.cancel()
+            raise
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        results = await asyncio.to_thread(self.results, job_id)
+        summary = summarize(results, job["total"], requirements, await job_analysis)
+        await asyncio.to_thread(self._finish, job_id, summary)
+        self._publish(job_id, "summary", summary)
+
+    def _pending(self, job_id: str) -> List[sqlite3.Row]:
+        # Candidates with a successful result are not run again
+        with self._lock:
+            return self._conn.execute(
+                "SELECT idx, filename, data FROM job_files WHERE job_id = ? AND idx NOT IN "
+                "(SELECT idx FROM job_results WHERE job_id = ? AND status != 'error') "
+                "ORDER BY idx",
+                (job_id, job_id),
+            ).fetchall()
+
+    def _finish(self, job_id: str, summary: dict) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'done', summary = ?, updated_at = ? WHERE id = ?",
+                (json.dumps(summary), time.time(), job_id),
+            )
+            # Keep only the files a retry would need
+            self._conn.execute(
+                "DELETE FROM job_files WHERE job_id = ? AND idx IN "
+                "(SELECT idx FROM job_results WHERE job_id = ? AND status != 'error')",
+                (job_id, job_id),
+            )
+            self._conn.commit()
+
+    def _save_result(self, job_id: str, record: dict) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO job_results (job_id, idx, status, record) "
+                "VALUES (?, ?, ?, ?)",
+                (job_id, record["index"], record["status"], json.dumps(record)),
+            )
+            self._conn.commit()
+
+    async def _fail_or_requeue(self, job: sqlite3.Row, error: str) -> None:
+        status = "queued" if job["attempts"] + 1 < JOB_MAX_ATTEMPTS else "failed"
+        await asyncio.to_thread(self._set_status, job["id"], status, error)
+        if status == "failed":
+            self._publish(job["id"], "failed", {"job_id": job["id"], "error": error})
+
+    def _set_status(self, job_id: str, status: str, error: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ?",
+                (status, error, time.time(), job_id),
+            )
+            self._conn.commit()
+
+    # Progress events
+
+    def _publish(self, job_id: str, event: str, data: dict) -> None:
+        for queue in self._subscribers.get(job_id, ()):
+            queue.put_nowait((event, data))
+
+    async def events(self, job_id: str) -> AsyncIterator[str]:
+        """Server-sent events: stored results first, then live results and the summary"""
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(job_id, set()).add(queue)
+        try:
+            # Subscribed before reading, so nothing published in between is lost
+            job = await asyncio.to_thread(self.get, job_id)
+            results = await asyncio.to_thread(self.results, job_id)
+            yield sse_event("status", job)
+            sent = {json.dumps(record, sort_keys=True) for record in results}
+            for record in results:
+                yield sse_event("result", record)
+            if job["status"] == "done":
+                yield sse_event("summary", job["summary"])
+                return
+            if job["status"] == "failed":
+                yield sse_event("failed", {"job_id": job_id, "error": job["error"]})
+                return
+
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), _KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event == "result" and json.dumps(data, sort_keys=True) in sent:
+                    continue
+                yield sse_event(event, data)
+                if event in ("summary", "failed"):
+                    return
+        finally:
+            self._subscribers[job_id].discard(queue)
+            if not self._subscribers[job_id]:
+                del self._subscribers[job_id]
+
+
+job_queue = JobQueue(JOB_DB)
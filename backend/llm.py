@@ -0,0 +1,50 @@
+import os
+from typing import Optional
+
+import httpx
+from openai import AsyncOpenAI
+from dotenv import load_dotenv
+
+load_dotenv()
+
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL", "https://api.groq.com/openai/v1")
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+LLM_MAX_KEEPALIVE = int(os.getenv("LLM_MAX_KEEPALIVE", "20"))
+
+_client: Optional[AsyncOpenAI] = None
+
+
+def init_client() -> AsyncOpenAI:
+    """Create the shared async LLM client and its connection pool"""
+    global _client
+    if _client is None:
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_MAX_KEEPALIVE,
+            ),
+            timeout=httpx.Timeout(LLM_TIMEOUT, connect=10.0),
+        )
+        _client = AsyncOpenAI(
+            api_key=os.getenv("GROQ_API_KEY"),
+            base_url=GROQ_BASE_URL,
+            timeout=LLM_TIMEOUT,
+            # Retries are handled by backend.llm_scheduler
+            max_retries=0,
+            http_client=http_client,
+        )
+    return _client
+
+
+def get_client() -> AsyncOpenAI:
+    """Return the shared client, creating it lazily outside the app lifespan"""
+    return _client or init_client()
+
+
+async def close_client() -> None:
+    """Close the shared client and release pooled connections"""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
@@ -0,0 +1,354 @@
+import asyncio
+import heapq
+import itertools
+import math
+import os
+import random
+import time
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import openai
+from dotenv import load_dotenv
+from openai.types import CompletionUsage
+
+from backend.llm import LLM_TIMEOUT, get_client
+from backend.metrics import (
+    LLM_ERRORS, LLM_IN_FLIGHT, LLM_QUEUE_SECONDS, LLM_REQUEST_SECONDS, LLM_TOKENS,
+    error_status
+)
+from backend.timing import timed
+
+load_dotenv()
+
+# Per-model limits; 0 disables the corresponding token bucket
+LLM_RPM = float(os.getenv("LLM_RPM", "0"))
+LLM_TPM = float(os.getenv("LLM_TPM", "0"))
+# AIMD concurrency window per model
+LLM_MIN_CONCURRENCY = int(os.getenv("LLM_MIN_CONCURRENCY", "1"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "32"))
+LLM_LATENCY_TARGET = float(os.getenv("LLM_LATENCY_TARGET", "30"))
+# Retries of 429, 5xx, timeouts and connection errors
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "30"))
+# Seconds an interactive call may take including retries, kept below the
+# frontend's request timeout; 0 disables the deadline
+LLM_INTERACTIVE_DEADLINE = float(os.getenv("LLM_INTERACTIVE_DEADLINE", "90"))
+
+# Priority lanes: lower runs first
+INTERACTIVE = 0
+BATCH = 1
+
+# Priority of LLM calls made from the current task; batch code sets BATCH
+llm_priority: ContextVar[int] = ContextVar("llm_priority", default=INTERACTIVE)
+
+_RETRYABLE = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+
+
+class TokenBucket:
+    """Refills ``per_minute`` units per minute, holding at most one minute's worth"""
+
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60.0
+        self.capacity = per_minute
+        self.tokens = per_minute
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` units are available (0 when disabled)"""
+        if self.rate <= 0:
+            return 0.0
+        self._refill()
+        amount = min(amount, self.capacity)
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def take(self, amount: float) -> None:
+        # May go negative when usage is reconciled upwards; refill pays it back
+        if self.rate > 0:
+            self._refill()
+            self.tokens -= amount
+
+
+class ModelLane:
+    """Admission control for one model: RPM/TPM buckets, an AIMD concurrency
+    window and a priority queue of waiting calls."""
+
+    def __init__(self):
+        self.requests = TokenBucket(LLM_RPM)
+        self.tokens = TokenBucket(LLM_TPM)
+        self.limit = float(max(LLM_MIN_CONCURRENCY, LLM_MAX_CONCURRENCY // 4))
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self._waiters: List[Tuple[int, int, float, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    async def acquire(self, priority: int, tokens: float) -> None:
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), tokens, future))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Granted just before the caller was cancelled: hand the slot back
+            if future.done() and not future.cancelled():
+                self.in_flight -= 1
+                self._dispatch()
+            raise
+
+    def release(self, latency: float, rate_limited: bool = False) -> None:
+        """Free a slot and adapt the window: halve on 429, shrink when slow,
+        otherwise grow by about one slot per window of successful calls"""
+        self.in_flight -= 1
+        if rate_limited:
+            self.limit = max(LLM_MIN_CONCURRENCY, self.limit / 2)
+        elif latency > LLM_LATENCY_TARGET:
+            self.limit = max(LLM_MIN_CONCURRENCY, self.limit * 0.9)
+        else:
+            self.limit = min(LLM_MAX_CONCURRENCY, self.limit + 1 / self.limit)
+        self._dispatch()
+
+    def reconcile(self, estimated: float, actual: float) -> None:
+        """Charge the TPM bucket for the difference between estimate and usage"""
+        self.tokens.take(actual - estimated)
+
+    def pause(self, seconds: float) -> None:
+        """Admit nothing for ``seconds`` (the server asked us to back off)"""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        while self._waiters and self._waiters[0][3].done():
+            heapq.heappop(self._waiters)  # cancelled while waiting
+        while self._waiters and self.in_flight < max(1, math.floor(self.limit)):
+            _, _, tokens, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            # Strict priority: a blocked head is not overtaken by later calls
+            wait = max(
+                self.paused_until - time.monotonic(),
+                self.requests.wait_time(1),
+                self.tokens.wait_time(tokens),
+            )
+            if wait > 0:
+                self._schedule(wait)
+                return
+            heapq.heappop(self._waiters)
+            self.requests.take(1)
+            self.tokens.take(tokens)
+            self.in_flight += 1
+            future.set_result(None)
+
+    def _schedule(self, delay: float) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+
+_lanes: Dict[str, ModelLane] = {}
+
+
+def _lane(model: str) -> ModelLane:
+    if model not in _lanes:
+        _lanes[model] = ModelLane()
+    return _lanes[model]
+
+
+def estimate_tokens(messages: List[dict], max_tokens: Optional[int]) -> float:
+    """Prompt tokens (about four characters each) plus the completion allowance"""
+    prompt = sum(len(str(message.get("content") or "")) for message in messages)
+    return prompt / 4 + (max_tokens or 1000)
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """Seconds requested by the server's Retry-After(-ms) header, if any"""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff(attempt: int) -> float:
+    """Full-jitter exponential backoff"""
+    return random.uniform(0, min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * 2 ** attempt))
+
+
+def _record(model: str, latency: float, usage=None, error: Optional[Exception] = None) -> None:
+    LLM_REQUEST_SECONDS.observe(latency, model=model)
+    if usage is not None:
+        LLM_TOKENS.inc(usage.prompt_tokens or 0, model=model, kind="prompt")
+        LLM_TOKENS.inc(usage.completion_tokens or 0, model=model, kind="completion")
+    if error is not None:
+        LLM_ERRORS.inc(model=model, status=error_status(error))
+
+
+def _chunk_usage(chunk) -> Optional[CompletionUsage]:
+    """Usage reported on a stream's last chunk (Groq sends it under ``x_groq``)"""
+    usage = getattr(chunk, "usage", None)
+    if usage is None:
+        extra = getattr(chunk, "x_groq", None)
+        if isinstance(extra, dict) and extra.get("usage"):
+            usage = CompletionUsage.model_validate(extra["usage"])
+    return usage
+
+
+async def _acquire(lane: ModelLane, model: str, priority: int, tokens: float) -> None:
+    start = time.monotonic()
+    await lane.acquire(priority, tokens)
+    LLM_QUEUE_SECONDS.observe(time.monotonic() - start, model=model)
+
+
+def _deadline(priority: int) -> Optional[float]:
+    """Monotonic time by which an interactive call must finish, or None"""
+    if priority != INTERACTIVE or LLM_INTERACTIVE_DEADLINE <= 0:
+        return None
+    return time.monotonic() + LLM_INTERACTIVE_DEADLINE
+
+
+def _timeout(deadline: Optional[float]) -> dict:
+    """Per-attempt timeout option that keeps the attempt inside the deadline"""
+    if deadline is None:
+        return {}
+    return {"timeout": max(1.0, min(LLM_TIMEOUT, deadline - time.monotonic()))}
+
+
+def _retryable(error: Exception, priority: int) -> bool:
+    # A timed-out interactive call has already used most of its time budget
+    return not (priority == INTERACTIVE and isinstance(error, openai.APITimeoutError))
+
+
+async def _wait_before_retry(lane: ModelLane, error: Exception, attempt: int,
+                             deadline: Optional[float]) -> None:
+    """Sleep before the next attempt; re-raise ``error`` if that would pass the deadline"""
+    wait = retry_after(error)
+    if wait is None:
+        wait = backoff(attempt)
+    else:
+        # Honour the server's delay (plus jitter so waiters do not return in lockstep)
+        if isinstance(error, openai.RateLimitError):
+            lane.pause(wait)
+        wait += random.uniform(0, LLM_BACKOFF_BASE)
+    if deadline is not None and time.monotonic() + wait >= deadline:
+        raise error
+    with timed("llm_backoff"):
+        await asyncio.sleep(wait)
+
+
+async def create_chat_completion(**kwargs):
+    """``chat.completions.create`` through the shared scheduler.
+
+    Waits for the model's rate limits and concurrency window (interactive
+    calls first), and retries rate limits, server errors and timeouts with
+    jittered backoff, honouring Retry-After. Interactive calls do not retry
+    timeouts and give up once LLM_INTERACTIVE_DEADLINE has passed.
+    """
+    model = kwargs["model"]
+    lane = _lane(model)
+    priority = llm_priority.get()
+    estimate = estimate_tokens(kwargs.get("messages", []), kwargs.get("max_tokens"))
+    deadline = _deadline(priority)
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        await _acquire(lane, model, priority, estimate)
+        start = time.monotonic()
+        rate_limited = False
+        LLM_IN_FLIGHT.inc(model=model)
+        try:
+            response = await get_client().chat.completions.create(
+                **kwargs, **_timeout(deadline)
+            )
+        except _RETRYABLE as e:
+            _record(model, time.monotonic() - start, error=e)
+            rate_limited = isinstance(e, openai.RateLimitError)
+            if attempt == LLM_MAX_RETRIES or not _retryable(e, priority):
+                raise
+            error = e
+        except Exception as e:
+            _record(model, time.monotonic() - start, error=e)
+            raise
+        else:
+            usage = getattr(response, "usage", None)
+            _record(model, time.monotonic() - start, usage)
+            if usage is not None:
+                lane.reconcile(estimate, usage.total_tokens)
+            return response
+        finally:
+            LLM_IN_FLIGHT.dec(model=model)
+            lane.release(time.monotonic() - start, rate_limited)
+        await _wait_before_retry(lane, error, attempt, deadline)
+
+
+async def stream_chat_completion(**kwargs) -> AsyncIterator[str]:
+    """Content deltas of a streamed completion, scheduled like ``create_chat_completion``.
+
+    The concurrency slot is held until the stream ends. Failures are retried
+    only while no content has been yielded yet.
+    """
+    model = kwargs["model"]
+    lane = _lane(model)
+    priority = llm_priority.get()
+    estimate = estimate_tokens(kwargs.get("messages", []), kwargs.get("max_tokens"))
+    deadline = _deadline(priority)
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        await _acquire(lane, model, priority, estimate)
+        start = time.monotonic()
+        rate_limited = False
+        started = False
+        usage = None
+        LLM_IN_FLIGHT.inc(model=model)
+        try:
+            stream = await get_client().chat.completions.create(
+                stream=True, **kwargs, **_timeout(deadline)
+            )
+            async for chunk in stream:
+                usage = _chunk_usage(chunk) or usage
+                if chunk.choices and chunk.choices[0].delta.content:
+                    started = True
+                    yield chunk.choices[0].delta.content
+            _record(model, time.monotonic() - start, usage)
+            if usage is not None:
+                lane.reconcile(estimate, usage.total_tokens)
+            return
+        except _RETRYABLE as e:
+            _record(model, time.monotonic() - start, error=e)
+            rate_limited = isinstance(e, openai.RateLimitError)
+            if started or attempt == LLM_MAX_RETRIES or not _retryable(e, priority):
+                raise
+            error = e
+        except Exception as e:
+            _record(model, time.monotonic() - start, error=e)
+            raise
+        finally:
+            LLM_IN_FLIGHT.dec(model=model)
+            lane.release(time.monotonic() - start, rate_limited)
+        await _wait_before_retry(lane, error, attempt, deadline)
+
+
+def llm_error(error: Exception) -> dict:
+    """Error result for a failed LLM call, with the HTTP status to report"""
+    if isinstance(error, openai.RateLimitError):
+        status_code = 429
+    elif isinstance(error, (openai.APIConnectionError, openai.InternalServerError)):
+        status_code = 503
+    else:
+        status_code = 500
+    return {"error": str(error), "status_code": status_code}
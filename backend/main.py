@@ -1,17 +1,55 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
+from fastapi import FastAPI, UploadFile, File, Form, Header, HTTPException
+from typing import List, Optional
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-import os
-import shutil
-from pathlib import Path
-import PyPDF2
-import docx
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from contextlib import asynccontextmanager
+import asyncio
+import time
 
-from backend.resume_extractor import extract_resume_details
-from backend.job_matcher import match_resume_to_job
-from backend.models import MatchRequest, AnalysisResponse
+from backend.batch import expand_uploads, stream_batch, stream_rerank
+from backend.candidates import candidate_store
+from backend.jobs import job_queue, sse_event
+from backend.skill_index import QueryError, skill_index
+from backend.vector_index import vector_index
+from backend.prescreen import PRESCREEN_THRESHOLD, prescreen
+from backend.parsers import (
+    SUPPORTED_EXTENSIONS, extract_text_from_upload, read_uploads,
+    start_parser_pool, shutdown_parser_pool
+)
+from backend.llm import init_client, close_client
+from backend.metrics import MetricsMiddleware, render as render_metrics
+from backend.profiling import PROFILE_SAMPLE_RATE, ProfilerMiddleware
+from backend.timing import ServerTimingMiddleware, request_timings, timed
+from backend.text_compaction import compact_resume_text
+from backend.resume_extractor import extract_resume_details_cached
+from backend.job_analyzer import analyze_job_description_cached
+from backend.job_matcher import route_match, stream_match_resume_to_job
+from backend.models import (
+    MatchRequest, AnalysisResponse, JobDescriptionRequest, RerankRequest,
+    SemanticSearchRequest
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled async LLM client shared by every request
+    init_client()
+    # Warm document parser processes
+    start_parser_pool()
+    # Load stored candidates into the skill and vector indexes and keep them updated
+    stored = candidate_store.list(include_details=True)
+    skill_index.rebuild(stored)
+    vector_index.sync(stored)
+    candidate_store.subscribe(skill_index)
+    candidate_store.subscribe(vector_index)
+    # Resume queued and interrupted jobs
+    await job_queue.start()
+    yield
+    await job_queue.stop()
+    vector_index.close()
+    await close_client()
+    shutdown_parser_pool()
 
-app = FastAPI(title="Resume Matcher API", version="1.0.0")
+app = FastAPI(title="Resume Matcher API", version="1.0.0", lifespan=lifespan)
 
 # CORS - Allow your frontend domain
 app.add_middleware(
@@ -26,37 +64,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-UPLOAD_DIR = Path("uploads")
-UPLOAD_DIR.mkdir(exist_ok=True)
-
-def extract_text_from_pdf(file_path: str) -> str:
-    """Extract text from PDF file"""
-    try:
-        with open(file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text()
-        return text
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Error reading PDF: {str(e)}")
-
-def extract_text_from_docx(file_path: str) -> str:
-    """Extract text from DOCX file"""
-    try:
-        doc = docx.Document(file_path)
-        text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-        return text
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Error reading DOCX: {str(e)}")
-
-def extract_text_from_txt(file_path: str) -> str:
-    """Extract text from TXT file"""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            return file.read()
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Error reading TXT: {str(e)}")
+# Request counts, durations and in-flight gauge for /metrics
+app.add_middleware(MetricsMiddleware)
+# Per-stage durations as a Server-Timing header
+app.add_middleware(ServerTimingMiddleware)
+# Debug only: sampled stack profiles written to PROFILE_DIR
+if PROFILE_SAMPLE_RATE > 0:
+    app.add_middleware(ProfilerMiddleware)
 
 @app.get("/")
 async def root():
@@ -65,10 +79,20 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "health": "/health",
+            "metrics": "/metrics",
             "docs": "/docs",
             "extract": "/extract-resume",
+            "analyze_job": "/analyze-job",
             "match": "/match-job",
-            "analyze": "/analyze"
+            "match_stream": "/match-job/stream",
+            "analyze": "/analyze",
+            "analyze_batch": "/analyze-batch",
+            "jobs": "/jobs",
+            "prescreen": "/prescreen",
+            "candidates": "/candidates",
+            "rerank": "/candidates/rerank",
+            "search": "/candidates/search",
+            "semantic_search": "/candidates/semantic-search"
         }
     }
 
@@ -79,34 +103,28 @@ async def health():
         "service": "resume-matcher-api"
     }
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics: stage latencies, LLM tokens and errors, cache hit ratios"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 @app.post("/extract-resume")
 async def extract_resume(file: UploadFile = File(...)):
     """Extract resume details from uploaded file"""
-    file_path = None
     try:
         # Validate file type
         if not file.filename:
             raise HTTPException(status_code=400, detail="No filename provided")
         
         file_extension = file.filename.split('.')[-1].lower()
-        if file_extension not in ['pdf', 'docx', 'txt']:
+        if file_extension not in SUPPORTED_EXTENSIONS:
             raise HTTPException(
                 status_code=400, 
                 detail="Unsupported file format. Please upload PDF, DOCX, or TXT."
             )
         
-        # Save file
-        file_path = UPLOAD_DIR / file.filename
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        # Extract text
-        if file_extension == 'pdf':
-            resume_text = extract_text_from_pdf(str(file_path))
-        elif file_extension == 'docx':
-            resume_text = extract_text_from_docx(str(file_path))
-        else:  # txt
-            resume_text = extract_text_from_txt(str(file_path))
+        # Extract text straight from the upload buffer
+        resume_text = await extract_text_from_upload(file, file_extension)
         
         # Validate extracted text
         if not resume_text or len(resume_text.strip()) < 10:
@@ -115,53 +133,141 @@ async def extract_resume(file: UploadFile = File(...)):
                 detail="Could not extract meaningful text from the file. Please check the file content."
             )
         
-        # Extract details using LLM
-        resume_details = extract_resume_details(resume_text)
+        # Strip headers/footers and fit the token budget before the LLM call
+        with timed("compaction"):
+            compact_text, compaction = compact_resume_text(resume_text)
         
-        # Clean up file
-        if file_path and os.path.exists(file_path):
-            os.remove(file_path)
+        # Extract details using LLM (or the cache for a previously seen resume)
+        resume_details, cache_hit = await extract_resume_details_cached(compact_text)
         
         if "error" in resume_details:
-            raise HTTPException(status_code=500, detail=resume_details["error"])
+            raise HTTPException(
+                status_code=resume_details.get("status_code", 500), detail=resume_details["error"]
+            )
+        
+        candidate_id = await asyncio.to_thread(
+            candidate_store.save, resume_text, resume_details, file.filename
+        )
+        
+        return JSONResponse(content={
+            "candidate_id": candidate_id,
+            "resume_details": resume_details,
+            "cache": {"resume_details": "hit" if cache_hit else "miss"},
+            "compaction": compaction,
+            "timings": request_timings()
+        })
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/analyze-job")
+async def analyze_job(request: JobDescriptionRequest):
+    """Structured requirements (skills, experience, education) of a job description"""
+    if not request.job_description or len(request.job_description.strip()) < 10:
+        raise HTTPException(
+            status_code=400,
+            detail="Job description is too short. Please provide a detailed job description."
+        )
+    try:
+        job_analysis, analysis_hit = await analyze_job_description_cached(request.job_description)
+        
+        if "error" in job_analysis:
+            raise HTTPException(
+                status_code=job_analysis.get("status_code", 500), detail=job_analysis["error"]
+            )
         
-        return JSONResponse(content={"resume_details": resume_details})
+        return {
+            "job_analysis": job_analysis,
+            "cache": {"job_analysis": "hit" if analysis_hit else "miss"}
+        }
     
     except HTTPException:
-        if file_path and os.path.exists(file_path):
-            os.remove(file_path)
         raise
     except Exception as e:
-        if file_path and os.path.exists(file_path):
-            os.remove(file_path)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/match-job")
 async def match_job(request: MatchRequest):
     """Match resume details with job description"""
     try:
-        match_result = match_resume_to_job(
+        # The posting is analyzed once and its requirements reused for every resume
+        job_analysis, analysis_hit = await analyze_job_description_cached(request.job_description)
+        match_result, match_hit, routing = await route_match(
             request.resume_details, 
-            request.job_description
+            request.job_description,
+            job_analysis
         )
         
         if "error" in match_result:
-            raise HTTPException(status_code=500, detail=match_result["error"])
+            raise HTTPException(
+                status_code=match_result.get("status_code", 500), detail=match_result["error"]
+            )
         
-        return JSONResponse(content={"match_analysis": match_result})
+        return JSONResponse(content={
+            "match_analysis": match_result,
+            "routing": routing,
+            "cache": {
+                "job_analysis": "hit" if analysis_hit else "miss",
+                "match_analysis": "hit" if match_hit else "miss"
+            },
+            "timings": request_timings()
+        })
     
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/match-job/stream")
+async def match_job_stream(request: MatchRequest):
+    """Match resume details with a job description, streamed as server-sent events.
+
+    A ``field`` event carries each top-level match field (``match_percentage``,
+    ``verdict``, ``matching_skills``, ...) as soon as the model has generated
+    it, followed by one ``result`` or ``error`` event.
+    """
+    async def events():
+        job_analysis, analysis_hit = await analyze_job_description_cached(request.job_description)
+        async for kind, payload in stream_match_resume_to_job(
+            request.resume_details, request.job_description, job_analysis
+        ):
+            if kind == "field":
+                name, value = payload
+                yield sse_event("field", {"name": name, "value": value})
+            elif kind == "result":
+                match_result, match_hit = payload
+                yield sse_event("result", {
+                    "match_analysis": match_result,
+                    "cache": {
+                        "job_analysis": "hit" if analysis_hit else "miss",
+                        "match_analysis": "hit" if match_hit else "miss"
+                    }
+                })
+            else:
+                yield sse_event("error", {
+                    "detail": payload["error"],
+                    "status_code": payload.get("status_code", 500)
+                })
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/prescreen")
+async def prescreen_resume(request: MatchRequest):
+    """Fast local (no LLM) score of resume details against a job description"""
+    return {"prescreen": prescreen(request.resume_details, request.job_description)}
+
 @app.post("/analyze")
 async def analyze_resume_and_job(
     file: UploadFile = File(...),
     job_description: str = Form(...)
 ):
     """Complete analysis: Extract resume and match with job description"""
-    file_path = None
     try:
         # Validate inputs
         if not file.filename:
@@ -174,57 +280,279 @@ async def analyze_resume_and_job(
             )
         
         file_extension = file.filename.split('.')[-1].lower()
-        if file_extension not in ['pdf', 'docx', 'txt']:
+        if file_extension not in SUPPORTED_EXTENSIONS:
             raise HTTPException(
                 status_code=400, 
                 detail="Unsupported file format. Please upload PDF, DOCX, or TXT."
             )
         
-        # Save and process file
-        file_path = UPLOAD_DIR / file.filename
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        # Extract text
-        if file_extension == 'pdf':
-            resume_text = extract_text_from_pdf(str(file_path))
-        elif file_extension == 'docx':
-            resume_text = extract_text_from_docx(str(file_path))
-        else:
-            resume_text = extract_text_from_txt(str(file_path))
-        
-        if not resume_text or len(resume_text.strip()) < 10:
-            raise HTTPException(
-                status_code=400,
-                detail="Could not extract meaningful text from the file."
+        # The JD analysis depends only on the job description: start it now so
+        # it runs while the document is parsed and the resume is extracted
+        analysis_task = asyncio.create_task(analyze_job_description_cached(job_description))
+        try:
+            # Extract text straight from the upload buffer
+            resume_text = await extract_text_from_upload(file, file_extension)
+            
+            if not resume_text or len(resume_text.strip()) < 10:
+                raise HTTPException(
+                    status_code=400,
+                    detail="Could not extract meaningful text from the file."
+                )
+            
+            # Extract resume details from the compacted text
+            with timed("compaction"):
+                compact_text, compaction = compact_resume_text(resume_text)
+            resume_details, cache_hit = await extract_resume_details_cached(compact_text)
+            
+            if "error" in resume_details:
+                raise HTTPException(
+                    status_code=resume_details.get("status_code", 500), detail=resume_details["error"]
+                )
+            
+            job_analysis, analysis_hit = await analysis_task
+            
+            # Store the candidate (and update its indexes) while the match runs
+            candidate_id, (match_result, match_hit, routing) = await asyncio.gather(
+                asyncio.to_thread(
+                    candidate_store.save, resume_text, resume_details, file.filename
+                ),
+                route_match(resume_details, job_description, job_analysis)
             )
-        
-        # Extract resume details
-        resume_details = extract_resume_details(resume_text)
-        
-        if "error" in resume_details:
-            raise HTTPException(status_code=500, detail=resume_details["error"])
-        
-        # Match with job
-        match_result = match_resume_to_job(resume_details, job_description)
+        finally:
+            # No-op once finished; the shared analysis itself keeps running for the cache
+            analysis_task.cancel()
         
         if "error" in match_result:
-            raise HTTPException(status_code=500, detail=match_result["error"])
-        
-        # Clean up
-        if file_path and os.path.exists(file_path):
-            os.remove(file_path)
+            raise HTTPException(
+                status_code=match_result.get("status_code", 500), detail=match_result["error"]
+            )
         
         return {
+            "candidate_id": candidate_id,
             "resume_details": resume_details,
-            "match_analysis": match_result
+            "match_analysis": match_result,
+            "routing": routing,
+            "cache": {
+                "resume_details": "hit" if cache_hit else "miss",
+                "job_analysis": "hit" if analysis_hit else "miss",
+                "match_analysis": "hit" if match_hit else "miss"
+            },
+            "compaction": compaction,
+            "timings": request_timings()
         }
     
     except HTTPException:
-        if file_path and os.path.exists(file_path):
-            os.remove(file_path)
         raise
     except Exception as e:
-        if file_path and os.path.exists(file_path):
-            os.remove(file_path)
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/analyze-batch")
+async def analyze_batch(
+    files: List[UploadFile] = File(...),
+    job_description: str = Form(...),
+    prescreen_threshold: Optional[float] = Form(None)
+):
+    """Screen many resumes (or zip archives of resumes) against one job description.
+
+    Streams NDJSON: one ``result`` record per candidate as soon as it finishes,
+    followed by a ``summary`` record ranking candidates by match percentage.
+    Candidates scoring below ``prescreen_threshold`` on the local pre-screen
+    skip the LLM match (defaults to PRESCREEN_THRESHOLD; 0 disables it).
+    """
+    if not job_description or len(job_description.strip()) < 10:
+        raise HTTPException(
+            status_code=400,
+            detail="Job description is too short. Please provide a detailed job description."
+        )
+
+    # Read uploads before streaming starts; the request body is closed afterwards
+    uploads = await read_uploads(files)
+    resumes = expand_uploads(uploads)
+    if not resumes:
+        raise HTTPException(status_code=400, detail="No resumes found in the upload.")
+
+    return StreamingResponse(
+        stream_batch(
+            resumes,
+            job_description,
+            PRESCREEN_THRESHOLD if prescreen_threshold is None else prescreen_threshold
+        ),
+        media_type="application/x-ndjson"
+    )
+
+@app.post("/jobs", status_code=202)
+async def submit_job(
+    files: List[UploadFile] = File(...),
+    job_description: str = Form(...),
+    prescreen_threshold: Optional[float] = Form(None),
+    idempotency_key: Optional[str] = Header(None)
+):
+    """Queue a batch screening and return its job id immediately.
+
+    Poll ``GET /jobs/{job_id}`` or follow ``GET /jobs/{job_id}/events`` for
+    progress. Resubmitting with the same ``Idempotency-Key`` header returns the
+    original job instead of queueing a new one.
+    """
+    if not job_description or len(job_description.strip()) < 10:
+        raise HTTPException(
+            status_code=400,
+            detail="Job description is too short. Please provide a detailed job description."
+        )
+
+    uploads = await read_uploads(files)
+    resumes = expand_uploads(uploads)
+    if not resumes:
+        raise HTTPException(status_code=400, detail="No resumes found in the upload.")
+
+    return await job_queue.submit(
+        resumes,
+        job_description,
+        PRESCREEN_THRESHOLD if prescreen_threshold is None else prescreen_threshold,
+        idempotency_key
+    )
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, include_results: bool = False):
+    """Status and progress of a queued screening, with its (partial) results on request"""
+    job = await asyncio.to_thread(job_queue.get, job_id, include_results)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """Server-sent events with each candidate result as it finishes, then the summary"""
+    if await asyncio.to_thread(job_queue.get, job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return StreamingResponse(job_queue.events(job_id), media_type="text/event-stream")
+
+@app.post("/jobs/{job_id}/retry")
+async def retry_job(job_id: str):
+    """Re-run the failed candidates of a finished job"""
+    job = await job_queue.retry(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/candidates")
+async def list_candidates(limit: Optional[int] = None, updated_since: Optional[float] = None):
+    """List stored candidates (without their full resume details)"""
+    candidates = await asyncio.to_thread(
+        candidate_store.list, updated_since=updated_since, limit=limit
+    )
+    total = await asyncio.to_thread(candidate_store.count)
+    return {"total": total, "candidates": candidates}
+
+async def load_candidates(candidate_ids: List[int]) -> List[dict]:
+    """Stored candidates (without resume details) in the order of ``candidate_ids``"""
+    if not candidate_ids:
+        return []
+    rows = await asyncio.to_thread(candidate_store.list, candidate_ids=candidate_ids)
+    by_id = {candidate["id"]: candidate for candidate in rows}
+    return [by_id[cid] for cid in candidate_ids if cid in by_id]
+
+@app.get("/candidates/search")
+async def search_candidates(
+    q: Optional[str] = None,
+    min_years: Optional[float] = None,
+    limit: int = 100
+):
+    """Find stored candidates by skills using the inverted index.
+
+    ``q`` is a boolean query over normalized skills, certifications, languages
+    and project technologies, e.g. ``kafka AND terraform AND NOT php``.
+    """
+    start = time.perf_counter()
+    try:
+        ids = skill_index.search(q, min_years)
+    except QueryError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid query: {str(e)}")
+
+    results = await load_candidates(ids[:limit].tolist())
+    for candidate in results:
+        candidate["years_experience"] = skill_index.years(candidate["id"])
+        candidate["skills"] = sorted(skill_index.terms(candidate["id"]))
+
+    return {
+        "query": q,
+        "total": int(ids.size),
+        "took_ms": round((time.perf_counter() - start) * 1000, 3),
+        "candidates": results
+    }
+
+@app.post("/candidates/semantic-search")
+async def semantic_search_candidates(request: SemanticSearchRequest):
+    """Top-k stored candidates by similarity of their experience text to a job description.
+
+    Uses the local hashing embedder, so no network model or LLM call is involved.
+    """
+    start = time.perf_counter()
+    hits = await asyncio.to_thread(vector_index.search, request.job_description, request.top_k)
+    similarities = dict(hits)
+    results = await load_candidates([cid for cid, _ in hits])
+    for candidate in results:
+        candidate["similarity"] = round(similarities[candidate["id"]], 4)
+
+    return {
+        "took_ms": round((time.perf_counter() - start) * 1000, 3),
+        "candidates": results
+    }
+
+@app.get("/candidates/{candidate_id}")
+async def get_candidate(candidate_id: int):
+    """Return one stored candidate with its extracted resume details"""
+    candidate = await asyncio.to_thread(candidate_store.get, candidate_id)
+    if candidate is None:
+        raise HTTPException(status_code=404, detail="Candidate not found")
+    return candidate
+
+@app.delete("/candidates/{candidate_id}")
+async def delete_candidate(candidate_id: int):
+    """Remove a candidate from the store"""
+    if not await asyncio.to_thread(candidate_store.delete, candidate_id):
+        raise HTTPException(status_code=404, detail="Candidate not found")
+    return {"deleted": candidate_id}
+
+@app.post("/candidates/rerank")
+async def rerank_candidates(request: RerankRequest):
+    """Re-rank stored candidates against a new job description.
+
+    Uses the stored resume details, so no files are parsed and the extraction
+    model is not called. Streams NDJSON in the same format as /analyze-batch.
+    """
+    if not request.job_description or len(request.job_description.strip()) < 10:
+        raise HTTPException(
+            status_code=400,
+            detail="Job description is too short. Please provide a detailed job description."
+        )
+
+    candidate_ids = request.candidate_ids
+    if request.semantic_top_k:
+        # Narrow the pool to the closest candidates before any LLM call
+        hits = await asyncio.to_thread(
+            vector_index.search, request.job_description, request.semantic_top_k
+        )
+        nearest = [cid for cid, _ in hits]
+        candidate_ids = [cid for cid in nearest if not candidate_ids or cid in candidate_ids]
+        if not candidate_ids:
+            raise HTTPException(status_code=404, detail="No stored candidates match the filter.")
+
+    candidates = await asyncio.to_thread(
+        candidate_store.list,
+        candidate_ids=candidate_ids,
+        updated_since=request.updated_since,
+        limit=request.limit,
+        include_details=True
+    )
+    if not candidates:
+        raise HTTPException(status_code=404, detail="No stored candidates match the filter.")
+
+    threshold = request.prescreen_threshold
+    return StreamingResponse(
+        stream_rerank(
+            candidates,
+            request.job_description,
+            PRESCREEN_THRESHOLD if threshold is None else threshold
+        ),
+        media_type="application/x-ndjson"
+    )
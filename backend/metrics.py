@@ -0,0 +1,274 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from backend.timing import add_timing
+
+# Latency buckets (seconds) covering sub-millisecond parsing up to slow LLM calls
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0,
+)
+
+_registry: List["_Metric"] = []
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self) -> Iterator[Tuple[str, str, float]]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, labels, value in self._samples():
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, e.g. requests or tokens"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self) -> Iterator[Tuple[str, str, float]]:
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield "", _format_labels(self.labelnames, key), value
+
+
+class Gauge(Counter):
+    """Value that goes up and down, e.g. requests in flight"""
+
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    """Distribution of observations (latencies in seconds) over fixed buckets.
+
+    ``request_timing`` (a format string over the labels, e.g. ``"{stage}"``)
+    also adds each observation to the current request's Server-Timing stages.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS,
+                 request_timing: Optional[str] = None):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.request_timing = request_timing
+        # Per label set: non-cumulative bucket counts (+Inf last), sum
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            entry[0][index] += 1
+            entry[1][0] += value
+        if self.request_timing is not None:
+            add_timing(self.request_timing.format(**labels), value)
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the wall-clock duration of the enclosed block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _samples(self) -> Iterator[Tuple[str, str, float]]:
+        with self._lock:
+            items = sorted((key, (list(counts), total[0]))
+                           for key, (counts, total) in self._values.items())
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                labels = _format_labels(
+                    self.labelnames + ("le",), key + (_format_value(bound),)
+                )
+                yield "_bucket", labels, cumulative
+            labels = _format_labels(self.labelnames, key)
+            yield "_sum", labels, total
+            yield "_count", labels, cumulative
+
+
+class _Computed(_Metric):
+    """Gauge whose samples are computed at scrape time"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str],
+                 collect: Callable[[], Dict[Tuple[str, ...], float]]):
+        super().__init__(name, documentation, labelnames)
+        self._collect = collect
+
+    def _samples(self) -> Iterator[Tuple[str, str, float]]:
+        for key, value in sorted(self._collect().items()):
+            yield "", _format_labels(self.labelnames, key), value
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format"""
+    return "\n".join(metric.render() for metric in _registry) + "\n"
+
+
+# HTTP
+HTTP_REQUESTS = Counter(
+    "resume_http_requests_total", "HTTP requests by route and status",
+    ("method", "path", "status"),
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "resume_http_request_duration_seconds", "HTTP request duration including streamed bodies",
+    ("path",),
+)
+HTTP_IN_FLIGHT = Gauge("resume_http_requests_in_flight", "HTTP requests being served")
+
+# Pipeline stages
+STAGE_SECONDS = Histogram(
+    "resume_stage_duration_seconds",
+    "Duration of pipeline stages (upload_read, extraction_llm, job_analysis_llm, "
+    "triage_llm, match_llm, json_parse)",
+    ("stage",), request_timing="{stage}",
+)
+PARSE_SECONDS = Histogram(
+    "resume_parse_duration_seconds", "Document text extraction duration by file type",
+    ("file_type",), request_timing="parse_{file_type}",
+)
+
+# LLM upstream
+LLM_REQUEST_SECONDS = Histogram(
+    "resume_llm_request_duration_seconds", "Upstream LLM call duration (one attempt)",
+    ("model",), request_timing="llm_upstream",
+)
+LLM_QUEUE_SECONDS = Histogram(
+    "resume_llm_queue_wait_seconds", "Time spent waiting for the model's rate limits and window",
+    ("model",), request_timing="llm_queue",
+)
+LLM_TOKENS = Counter(
+    "resume_llm_tokens_total", "Tokens reported by the LLM API", ("model", "kind"),
+)
+LLM_ERRORS = Counter(
+    "resume_llm_errors_total", "Failed upstream LLM calls by status", ("model", "status"),
+)
+LLM_IN_FLIGHT = Gauge(
+    "resume_llm_requests_in_flight", "Upstream LLM calls in progress", ("model",),
+)
+
+# Caches
+CACHE_REQUESTS = Counter(
+    "resume_cache_requests_total",
+    "Cache lookups: hit, coalesced (joined an in-flight call) or miss",
+    ("cache", "result"),
+)
+
+
+def _hit_ratios() -> Dict[Tuple[str, ...], float]:
+    totals: Dict[str, List[float]] = {}
+    for (cache, result), value in list(CACHE_REQUESTS._values.items()):
+        counts = totals.setdefault(cache, [0.0, 0.0])
+        counts[1] += value
+        if result != "miss":
+            counts[0] += value
+    return {(cache,): hits / total for cache, (hits, total) in totals.items() if total}
+
+
+CACHE_HIT_RATIO = _Computed(
+    "resume_cache_hit_ratio", "Share of lookups served without an upstream call",
+    ("cache",), _hit_ratios,
+)
+
+
+def error_status(error: Exception) -> str:
+    """Label for a failed upstream call: the HTTP status, or the error class"""
+    status: Optional[int] = getattr(error, "status_code", None)
+    if status is not None:
+        return str(status)
+    return type(error).__name__
+
+
+class MetricsMiddleware:
+    """ASGI middleware counting requests in flight, by route and status.
+
+    Plain ASGI rather than ``BaseHTTPMiddleware`` so it adds no task or
+    buffering to streamed responses.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            # The matched route template keeps ids out of the label values
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            HTTP_REQUESTS.inc(method=scope["method"], path=path, status=str(status[0]))
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start, path=path)
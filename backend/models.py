@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 
 class ContactInfo(BaseModel):
@@ -47,6 +47,31 @@ class MatchRequest(BaseModel):
     resume_details: Dict[str, Any]
     job_description: str
 
+class JobDescriptionRequest(BaseModel):
+    job_description: str
+
+class JobAnalysis(BaseModel):
+    job_title: Optional[str] = None
+    seniority: Optional[str] = None
+    must_have_skills: List[str] = []
+    nice_to_have_skills: List[str] = []
+    min_years_experience: Optional[float] = None
+    education: List[str] = []
+    certifications: List[str] = []
+    responsibilities: List[str] = []
+
+class RerankRequest(BaseModel):
+    job_description: str
+    candidate_ids: Optional[List[int]] = None
+    updated_since: Optional[float] = None
+    limit: Optional[int] = None
+    prescreen_threshold: Optional[float] = None
+    semantic_top_k: Optional[int] = Field(None, ge=1, le=1000)
+
+class SemanticSearchRequest(BaseModel):
+    job_description: str
+    top_k: int = Field(50, ge=1, le=1000)
+
 class MatchResult(BaseModel):
     match_percentage: int
     verdict: str
@@ -61,6 +86,13 @@ class MatchResult(BaseModel):
     interview_likelihood: str
     summary: str
 
+class TriageResult(BaseModel):
+    match_percentage: int
+    verdict: str
+    matching_skills: List[str] = []
+    missing_critical_requirements: List[str] = []
+    summary: Optional[str] = None
+
 class AnalysisResponse(BaseModel):
     resume_details: Dict[str, Any]
     match_analysis: MatchResult
\ No newline at end of file
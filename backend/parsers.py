@@ -0,0 +1,245 @@
+from fastapi import HTTPException, UploadFile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple, Union
+import asyncio
+import codecs
+import io
+import multiprocessing
+import os
+import shutil
+import tempfile
+import PyPDF2
+import docx
+
+from backend.metrics import PARSE_SECONDS, STAGE_SECONDS
+
+SUPPORTED_EXTENSIONS = ('pdf', 'docx', 'txt')
+
+UPLOAD_DIR = Path("uploads")
+UPLOAD_DIR.mkdir(exist_ok=True)
+
+PARSER_WORKERS = int(os.getenv("PARSER_WORKERS", str(min(4, os.cpu_count() or 1))))
+PARSER_MAX_TASKS_PER_CHILD = int(os.getenv("PARSER_MAX_TASKS_PER_CHILD", "200"))
+PDF_PAGES_PER_CHUNK = int(os.getenv("PDF_PAGES_PER_CHUNK", "8"))
+# Uploads up to this size are parsed straight from memory; larger ones are
+# spilled to a uniquely named file so workers do not each receive a copy
+UPLOAD_SPILL_BYTES = int(os.getenv("UPLOAD_SPILL_BYTES", str(4 * 1024 * 1024)))
+
+# Limits enforced before parsing, and the text budget after which parsing stops
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "50"))
+MAX_RESUME_CHARS = int(os.getenv("MAX_RESUME_CHARS", "40000"))
+
+# A document is either its raw bytes or the path of a spilled file
+Source = Union[bytes, str]
+
+class DocumentTooLarge(Exception):
+    """The document exceeds an upload or page limit"""
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+# Worker functions: module level so they can run in the process pool. They
+# raise plain exceptions, which the callers turn into HTTP errors.
+
+def _open(source: Source):
+    # BytesIO shares the bytes buffer within a process, but bytes sent to a pool
+    # worker are pickled, so each worker call costs a copy of the document
+    return io.BytesIO(source) if isinstance(source, bytes) else open(source, 'rb')
+
+def _has_text_resources(resources, depth: int = 0) -> bool:
+    # Text may be drawn inside Form XObjects (common in templated PDFs), so
+    # look for fonts in their resources too; anything unexpected counts as text
+    if "/Font" in resources:
+        return True
+    xobjects = resources.get("/XObject")
+    if xobjects is None:
+        return False
+    for xobject in xobjects.get_object().values():
+        xobject = xobject.get_object()
+        if xobject.get("/Subtype") == "/Image":
+            continue
+        form_resources = xobject.get("/Resources")
+        if form_resources is None or depth >= 5:
+            return True
+        if _has_text_resources(form_resources.get_object(), depth + 1):
+            return True
+    return False
+
+def _is_image_only(page) -> bool:
+    # Scanned pages carry image XObjects but no fonts; skip them without
+    # running the (expensive) text extraction
+    resources = page.get("/Resources")
+    if resources is None:
+        return False
+    resources = resources.get_object()
+    return "/XObject" in resources and not _has_text_resources(resources)
+
+def iter_pdf_pages(pdf_reader, start: int, stop: int) -> Iterator[str]:
+    """Lazily yield the text of pages [start, stop), skipping image-only pages"""
+    for i in range(start, stop):
+        page = pdf_reader.pages[i]
+        if _is_image_only(page):
+            continue
+        yield page.extract_text() or ""
+
+def _pdf_pages_text(source: Source, start: int, stop: Optional[int],
+                    max_chars: Optional[int] = None) -> Tuple[List[str], int]:
+    """Text of pages [start, stop) and the document's total page count.
+
+    Stops early once ``max_chars`` characters have been collected.
+    """
+    with _open(source) as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        total = len(pdf_reader.pages)
+        if total > PDF_MAX_PAGES:
+            raise DocumentTooLarge(f"PDF has {total} pages (max {PDF_MAX_PAGES})")
+        stop = total if stop is None else min(stop, total)
+        pages, collected = [], 0
+        for text in iter_pdf_pages(pdf_reader, start, stop):
+            pages.append(text)
+            collected += len(text)
+            if max_chars is not None and collected >= max_chars:
+                break
+        return pages, total
+
+def _docx_text(source: Source, max_chars: Optional[int] = None) -> str:
+    with _open(source) as file:
+        doc = docx.Document(file)
+    paragraphs, collected = [], 0
+    for paragraph in doc.paragraphs:
+        paragraphs.append(paragraph.text)
+        collected += len(paragraph.text) + 1
+        if max_chars is not None and collected >= max_chars:
+            break
+    return "\n".join(paragraphs)[:max_chars]
+
+def _txt_text(source: Source, max_chars: Optional[int] = None) -> str:
+    with _open(source) as file:
+        # Read only as many bytes as the budget can use (UTF-8 is <= 4 bytes/char)
+        data = file.read(-1 if max_chars is None else max_chars * 4)
+    # The incremental decoder tolerates a character cut off at the read limit
+    # while still rejecting invalid UTF-8
+    return codecs.getincrementaldecoder('utf-8')().decode(data, final=False)[:max_chars]
+
+def _warm_up() -> int:
+    return os.getpid()
+
+def start_parser_pool() -> None:
+    """Start the parsing process pool and spawn its workers up front"""
+    global _pool
+    if _pool is not None or PARSER_WORKERS <= 0:
+        return
+    # max_tasks_per_child recycles workers to cap leaks; it requires spawn
+    _pool = ProcessPoolExecutor(
+        max_workers=PARSER_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+        max_tasks_per_child=PARSER_MAX_TASKS_PER_CHILD,
+    )
+    for future in [_pool.submit(_warm_up) for _ in range(PARSER_WORKERS)]:
+        future.result()
+
+def shutdown_parser_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+
+async def _run(func, *args):
+    """Run a parser function in the process pool, or a thread if there is none"""
+    if _pool is None:
+        return await asyncio.to_thread(func, *args)
+    return await asyncio.get_running_loop().run_in_executor(_pool, func, *args)
+
+async def _parse_pdf(source: Source, max_chars: int) -> str:
+    # The first chunk also reports the page count. Longer documents fan out
+    # only as many further chunks as the character budget is likely to need,
+    # parse them on other workers and reassemble them in order.
+    first, total = await _run(_pdf_pages_text, source, 0, PDF_PAGES_PER_CHUNK, max_chars)
+    # Pages are separated by form feeds so repeated headers/footers can be found later
+    text = "\f".join(first)
+    remaining = max_chars - len(text)
+    if total <= PDF_PAGES_PER_CHUNK or remaining <= 0:
+        return text[:max_chars]
+
+    chars_per_page = max(len(text) / PDF_PAGES_PER_CHUNK, 1.0)
+    pages_needed = int(remaining / chars_per_page * 1.5) + 1
+    last_page = min(total, PDF_PAGES_PER_CHUNK + pages_needed)
+    # Write in-memory bytes to disk once rather than pickling the whole
+    # document to every worker
+    spilled = None
+    if isinstance(source, bytes) and _pool is not None:
+        source = spilled = await asyncio.to_thread(_spill, io.BytesIO(source), "pdf")
+    try:
+        chunks = await asyncio.gather(*[
+            _run(_pdf_pages_text, source, start, start + PDF_PAGES_PER_CHUNK, remaining)
+            for start in range(PDF_PAGES_PER_CHUNK, last_page, PDF_PAGES_PER_CHUNK)
+        ])
+    finally:
+        if spilled is not None:
+            os.remove(spilled)
+    return "\f".join([text, *("\f".join(pages) for pages, _ in chunks)])[:max_chars]
+
+async def extract_text_async(source: Source, file_extension: str,
+                             max_chars: int = MAX_RESUME_CHARS) -> str:
+    """Extract up to ``max_chars`` of text from bytes or a file path off the event loop"""
+    try:
+        with PARSE_SECONDS.time(file_type=file_extension):
+            if file_extension == 'pdf':
+                return await _parse_pdf(source, max_chars)
+            elif file_extension == 'docx':
+                return await _run(_docx_text, source, max_chars)
+            return await _run(_txt_text, source, max_chars)
+    except DocumentTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Error reading {file_extension.upper()}: {str(e)}"
+        )
+
+def check_upload_size(size: Optional[int]) -> None:
+    """Reject uploads over MAX_UPLOAD_BYTES before any parsing"""
+    if size is not None and size > MAX_UPLOAD_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"File is too large (max {MAX_UPLOAD_BYTES // (1024 * 1024)} MB)."
+        )
+
+def _spill(fileobj, file_extension: str) -> str:
+    """Copy a large upload to a uniquely named file and return its path"""
+    fd, file_path = tempfile.mkstemp(suffix=f".{file_extension}", dir=UPLOAD_DIR)
+    with os.fdopen(fd, "wb") as buffer:
+        shutil.copyfileobj(fileobj, buffer)
+    return file_path
+
+async def extract_text_from_bytes(data: bytes, file_extension: str) -> str:
+    """Extract text from in-memory document bytes, spilling only large ones to disk"""
+    check_upload_size(len(data))
+    if len(data) <= UPLOAD_SPILL_BYTES:
+        return await extract_text_async(data, file_extension)
+    file_path = await asyncio.to_thread(_spill, io.BytesIO(data), file_extension)
+    try:
+        return await extract_text_async(file_path, file_extension)
+    finally:
+        os.remove(file_path)
+
+async def extract_text_from_upload(file: UploadFile, file_extension: str) -> str:
+    """Extract text from an upload without a filesystem round trip in the common case"""
+    check_upload_size(file.size)
+    if file.size is not None and file.size > UPLOAD_SPILL_BYTES:
+        with STAGE_SECONDS.time(stage="upload_read"):
+            await file.seek(0)
+            file_path = await asyncio.to_thread(_spill, file.file, file_extension)
+        try:
+            return await extract_text_async(file_path, file_extension)
+        finally:
+            os.remove(file_path)
+    with STAGE_SECONDS.time(stage="upload_read"):
+        data = await file.read()
+    return await extract_text_from_bytes(data, file_extension)
+
+async def read_uploads(files: List[UploadFile]) -> List[Tuple[str, bytes]]:
+    """(filename, bytes) of each upload, read before the request body is closed"""
+    with STAGE_SECONDS.time(stage="upload_read"):
+        return [(file.filename or "", await file.read()) for file in files]
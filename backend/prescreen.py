@@ -0,0 +1,279 @@
+import os
+import re
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+PRESCREEN_THRESHOLD = float(os.getenv("PRESCREEN_THRESHOLD", "0"))
+
+# canonical term -> aliases (matched after the same tokenization as resume text).
+# Aliases are spelling and abbreviation variants only: a broader or related term
+# (e.g. "containers" for docker) would inflate overlap scores and skill searches
+SKILL_VOCABULARY: Dict[str, List[str]] = {
+    # Languages
+    "python": ["python3"],
+    "java": [],
+    "javascript": ["js", "ecmascript", "es6"],
+    "typescript": [],
+    "golang": [],
+    "rust": [],
+    "c++": ["cpp"],
+    "c#": ["csharp", "c sharp"],
+    "ruby": [],
+    "php": [],
+    "scala": [],
+    "kotlin": [],
+    "swift": [],
+    "sql": [],
+    "bash": [],
+    "matlab": [],
+    # Web and frameworks
+    "react": ["react.js", "reactjs"],
+    "angular": ["angular.js", "angularjs"],
+    "vue": ["vue.js", "vuejs"],
+    "node.js": ["node", "nodejs"],
+    "django": [],
+    "flask": [],
+    "fastapi": [],
+    "spring": ["spring boot", "springboot"],
+    "rails": ["ruby on rails", "ror"],
+    ".net": ["dotnet"],
+    "graphql": [],
+    "rest api": ["restful", "rest apis", "restful apis"],
+    "grpc": [],
+    "html": ["html5"],
+    "css": ["css3"],
+    # Data and ML
+    "machine learning": [],
+    "deep learning": [],
+    "nlp": ["natural language processing"],
+    "computer vision": [],
+    "llm": ["llms", "large language models", "large language model"],
+    "pytorch": ["torch"],
+    "tensorflow": [],
+    "scikit-learn": ["sklearn", "scikit learn"],
+    "pandas": [],
+    "numpy": [],
+    "spark": ["apache spark", "pyspark"],
+    "hadoop": [],
+    "airflow": ["apache airflow"],
+    "dbt": [],
+    "kafka": ["apache kafka"],
+    "etl": [],
+    "data warehousing": ["data warehouse"],
+    "snowflake": [],
+    "bigquery": ["big query"],
+    "redshift": [],
+    "tableau": [],
+    "power bi": ["powerbi"],
+    "statistics": ["statistical analysis"],
+    # Databases
+    "postgresql": ["postgres", "psql"],
+    "mysql": [],
+    "mongodb": ["mongo"],
+    "redis": [],
+    "elasticsearch": ["elastic search"],
+    "cassandra": [],
+    "dynamodb": ["dynamo db"],
+    "nosql": [],
+    # Cloud and infrastructure
+    "aws": ["amazon web services"],
+    "azure": ["microsoft azure"],
+    "gcp": ["google cloud", "google cloud platform"],
+    "docker": [],
+    "kubernetes": ["k8s"],
+    "terraform": [],
+    "ansible": [],
+    "ci/cd": ["cicd", "continuous integration", "continuous delivery", "continuous deployment"],
+    "jenkins": [],
+    "github actions": [],
+    "gitlab": ["gitlab ci"],
+    "git": [],
+    "linux": [],
+    "microservices": ["microservice", "micro services"],
+    "serverless": [],
+    "prometheus": [],
+    "grafana": [],
+    "observability": [],
+    # Practices and roles
+    "agile": [],
+    "tdd": ["test driven development"],
+    "system design": [],
+    "security": ["cybersecurity", "infosec"],
+    "leadership": [],
+    "project management": [],
+    "backend": ["back end", "back-end"],
+    "frontend": ["front end", "front-end"],
+    "full stack": ["fullstack", "full-stack"],
+    "devops": ["dev ops"],
+    "data engineering": ["data engineer"],
+    "data science": ["data scientist"],
+    # Education
+    "bachelor": ["bachelors", "bachelor's", "bsc", "b.sc", "b.s", "b.a", "btech", "b.tech", "b.e"],
+    "master": ["masters", "master's", "msc", "m.sc", "m.s", "mba", "mtech", "m.tech"],
+    "phd": ["ph.d", "doctorate"],
+    "computer science": [],
+}
+
+# Short or common-word aliases that are only trusted as whole resume list
+# entries (e.g. "Go" in technical_skills), never when scanning prose
+EXACT_ONLY_ALIASES: Dict[str, str] = {
+    "go": "golang",
+    "r": "r",
+    "c": "c",
+    "py": "python",
+    "ts": "typescript",
+    "rest": "rest api",
+    "ml": "machine learning",
+    "dl": "deep learning",
+    "cv": "computer vision",
+    "tf": "tensorflow",
+    "bs": "bachelor",
+    "ba": "bachelor",
+    "be": "bachelor",
+    "ms": "master",
+    "cs": "computer science",
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9+#]+(?:[.'][a-z0-9+#]+)*|\.net")
+
+
+def _tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _build_index() -> Tuple[List[str], Dict[Tuple[str, ...], int], int]:
+    terms = sorted(set(SKILL_VOCABULARY) | set(EXACT_ONLY_ALIASES.values()))
+    term_ids = {term: i for i, term in enumerate(terms)}
+    phrases: Dict[Tuple[str, ...], int] = {}
+    for canonical, aliases in SKILL_VOCABULARY.items():
+        for phrase in [canonical, *aliases]:
+            tokens = tuple(_tokenize(phrase))
+            if tokens:
+                phrases.setdefault(tokens, term_ids[canonical])
+    max_len = max(len(p) for p in phrases)
+    return terms, phrases, max_len
+
+
+TERMS, _PHRASES, _MAX_PHRASE_LEN = _build_index()
+_TERM_IDS = {term: i for i, term in enumerate(TERMS)}
+
+
+def normalize_skill(skill: str) -> Optional[str]:
+    """Map a single skill string to its canonical vocabulary term, if known"""
+    tokens = tuple(_tokenize(skill))
+    if tokens in _PHRASES:
+        return TERMS[_PHRASES[tokens]]
+    key = " ".join(tokens)
+    if key in EXACT_ONLY_ALIASES:
+        return EXACT_ONLY_ALIASES[key]
+    return None
+
+
+def extract_terms(text: str) -> Dict[int, int]:
+    """Find vocabulary terms in free text; returns term id -> occurrence count.
+
+    Longest phrase wins at each position, so "spring boot" is not also
+    counted as a separate shorter match.
+    """
+    tokens = _tokenize(text)
+    counts: Dict[int, int] = {}
+    i = 0
+    while i < len(tokens):
+        for n in range(min(_MAX_PHRASE_LEN, len(tokens) - i), 0, -1):
+            term_id = _PHRASES.get(tuple(tokens[i:i + n]))
+            if term_id is not None:
+                counts[term_id] = counts.get(term_id, 0) + 1
+                i += n
+                break
+        else:
+            i += 1
+    return counts
+
+
+class JobRequirements:
+    """Requirement terms pulled from one job description, as a weight vector.
+
+    Build it once per job description and reuse it for every candidate.
+    """
+
+    def __init__(self, job_description: str):
+        counts = extract_terms(job_description)
+        self.weights = np.zeros(len(TERMS), dtype=np.float32)
+        for term_id, count in counts.items():
+            # Repeated mentions signal importance, with diminishing returns
+            self.weights[term_id] = min(1.0 + 0.5 * (count - 1), 2.0)
+        self.term_ids = np.flatnonzero(self.weights)
+        self.total_weight = float(self.weights.sum())
+
+    @property
+    def terms(self) -> List[str]:
+        return [TERMS[i] for i in self.term_ids]
+
+
+def candidate_terms(resume_details: dict) -> Set[int]:
+    """Vocabulary terms found in a resume's skills, certifications, titles and education"""
+    found: Set[int] = set()
+    for skill in resume_details.get("technical_skills") or []:
+        canonical = normalize_skill(str(skill))
+        if canonical is not None:
+            found.add(_TERM_IDS[canonical])
+        else:
+            found.update(extract_terms(str(skill)))
+
+    texts: List[str] = [str(c) for c in resume_details.get("certifications") or []]
+    for job in resume_details.get("work_experience") or []:
+        if isinstance(job, dict) and job.get("title"):
+            texts.append(str(job["title"]))
+    for edu in resume_details.get("education") or []:
+        if isinstance(edu, dict):
+            texts.append(f"{edu.get('degree') or ''} {edu.get('institution') or ''}")
+    for text in texts:
+        found.update(extract_terms(text))
+    return found
+
+
+def candidate_vector(resume_details: dict) -> np.ndarray:
+    vector = np.zeros(len(TERMS), dtype=np.float32)
+    ids = list(candidate_terms(resume_details))
+    if ids:
+        vector[ids] = 1.0
+    return vector
+
+
+def score_candidates(
+    requirements: JobRequirements, resumes: Sequence[dict]
+) -> List[dict]:
+    """Score many resumes at once with one matrix-vector product.
+
+    The score is the weighted share of job requirement terms the candidate has.
+    """
+    if not resumes:
+        return []
+    matrix = np.vstack([candidate_vector(r) for r in resumes])
+    if requirements.total_weight == 0:
+        scores = np.zeros(len(resumes), dtype=np.float32)
+    else:
+        scores = (matrix @ requirements.weights) / requirements.total_weight * 100.0
+
+    required = requirements.term_ids
+    hits = matrix[:, required] > 0
+    results = []
+    for row, score in enumerate(scores):
+        results.append({
+            "score": int(round(float(score))),
+            "matched_skills": [TERMS[i] for i in required[hits[row]]],
+            "missing_skills": [TERMS[i] for i in required[~hits[row]]],
+        })
+    return results
+
+
+def prescreen(resume_details: dict, job_description: str) -> dict:
+    """Fast local score (0-100) and matched/missing requirement terms"""
+    return score_candidates(JobRequirements(job_description), [resume_details])[0]
+
+
+def passes_threshold(result: dict, threshold: float) -> bool:
+    """True when the candidate should go on to the full LLM match"""
+    return threshold <= 0 or result["score"] >= threshold
+
@@ -0,0 +1,101 @@
+import collections
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Debug only: fraction of requests to profile (0 disables the profiler entirely)
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", "profiles"))
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL_MS", "5")) / 1000
+
+
+class StackSampler:
+    """Wall-clock sampling profiler for the whole process.
+
+    A daemon thread snapshots every thread's Python stack each ``interval``
+    seconds and, once stopped, writes them in the collapsed format read by
+    ``flamegraph.pl`` and speedscope (``thread;outer;...;inner count``).
+    Nothing is traced, so profiled code runs at full speed apart from the
+    brief snapshots.
+    """
+
+    def __init__(self, path: Path, interval: float = PROFILE_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self.samples: "collections.Counter[str]" = collections.Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling; the profile is written by the sampler thread"""
+        self._stopped.set()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                name = names.get(thread_id, str(thread_id))
+                if name == "stack-sampler":
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(
+                        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+                    )
+                    frame = frame.f_back
+                stack.append(name)
+                self.samples[";".join(part.replace(";", ":") for part in reversed(stack))] += 1
+        self._write()
+
+    def _write(self) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "w") as file:
+                for stack, count in self.samples.items():
+                    file.write(f"{stack} {count}\n")
+        except OSError as e:
+            print(f"Error writing profile {self.path}: {e}")
+
+
+def profile_path(method: str, path: str) -> Path:
+    """Unique, readable file name for one request's profile"""
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", path).strip("-") or "root"
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    return PROFILE_DIR / f"{stamp}-{method.lower()}-{slug}-{uuid.uuid4().hex[:8]}.folded"
+
+
+class ProfilerMiddleware:
+    """Profiles a random ``PROFILE_SAMPLE_RATE`` share of requests with a ``StackSampler``.
+
+    The sampler sees every thread, so requests served concurrently with a
+    profiled one show up in its profile as well.
+    """
+
+    def __init__(self, app, sample_rate: float = PROFILE_SAMPLE_RATE):
+        self.app = app
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or random.random() >= self.sample_rate:
+            await self.app(scope, receive, send)
+            return
+
+        sampler = StackSampler(profile_path(scope["method"], scope["path"]))
+        sampler.start()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            sampler.stop()
@@ -1,54 +1,69 @@
 import os
-import json
-from openai import OpenAI
-from dotenv import load_dotenv
+from typing import Tuple
 
-load_dotenv()
+from backend.cache import (
+    CACHE_DIR, ResultCache, SqliteStore, content_hash, normalize_text, prompt_version
+)
+from backend.llm_scheduler import llm_error
+from backend.metrics import STAGE_SECONDS
+from backend.models import ResumeDetails
+from backend.structured_output import StructuredOutputError, complete_structured
 
-client = OpenAI(
-    api_key=os.getenv("GROQ_API_KEY"),
-    base_url="https://api.groq.com/openai/v1",
-    timeout=60.0, 
+EXTRACTION_MODEL = "llama-3.1-8b-instant"
+EXTRACTION_PROMPT_PATH = "./prompts/extract_resume.txt"
 
+resume_cache = ResultCache(
+    max_size=int(os.getenv("RESUME_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("RESUME_CACHE_TTL", str(7 * 24 * 3600))),
+    store=SqliteStore(CACHE_DIR / "cache.db", "resume_details")
+    if os.getenv("RESUME_CACHE_PERSIST", "1") == "1" else None,
+    name="resume_details",
 )
 
-def extract_resume_details(resume_text: str) -> dict:
+def resume_cache_key(resume_text: str) -> str:
+    """Cache key for a resume: normalized text + model + prompt version"""
+    return content_hash(
+        normalize_text(resume_text),
+        EXTRACTION_MODEL,
+        prompt_version(EXTRACTION_PROMPT_PATH),
+    )
+
+async def extract_resume_details_cached(resume_text: str) -> Tuple[dict, bool]:
+    """Extract resume details, reusing a previous result for identical text.
+
+    Returns the details and whether they came from the cache.
+    """
+    return await resume_cache.get_or_create(
+        resume_cache_key(resume_text),
+        lambda: extract_resume_details(resume_text),
+        cacheable=lambda details: "error" not in details,
+    )
+
+async def extract_resume_details(resume_text: str) -> dict:
     """Extract structured information from resume text"""
     try:
-        with open("./prompts/extract_resume.txt", "r") as file:
+        with open(EXTRACTION_PROMPT_PATH, "r") as file:
             prompt = file.read()
         
-        response = client.chat.completions.create(
-            messages=[
-                {"role": "system", "content": prompt},
-                {
-                    "role": "user",
-                    "content": f"Extract information from this resume:\n\n{resume_text}"
-                }
-            ],
-            model="llama-3.1-8b-instant",
-            temperature=0.1,
-            max_tokens=2000,  
-
-        )
-        
-        extracted_text = response.choices[0].message.content.strip()
-        
-        # Clean markdown formatting
-        if extracted_text.startswith("```json"):
-            extracted_text = extracted_text[7:]
-        if extracted_text.startswith("```"):
-            extracted_text = extracted_text[3:]
-        if extracted_text.endswith("```"):
-            extracted_text = extracted_text[:-3]
-        
-        extracted_details = json.loads(extracted_text.strip())
-        return extracted_details
+        with STAGE_SECONDS.time(stage="extraction_llm"):
+            return await complete_structured(
+                ResumeDetails,
+                messages=[
+                    {"role": "system", "content": prompt},
+                    {
+                        "role": "user",
+                        "content": f"Extract information from this resume:\n\n{resume_text}"
+                    }
+                ],
+                model=EXTRACTION_MODEL,
+                temperature=0.1,
+                max_tokens=2000,
+            )
     
-    except json.JSONDecodeError as e:
+    except StructuredOutputError as e:
         print(f"Error parsing JSON: {e}")
-        return {"error": "Failed to parse resume", "raw_response": extracted_text}
+        return {"error": "Failed to parse resume", "raw_response": e.raw}
     
     except Exception as e:
         print(f"Error extracting resume: {e}")
-        return {"error": str(e)}
\ No newline at end of file
+        return llm_error(e)
@@ -0,0 +1,71 @@
+import os
+import re
+from typing import Any, List, Optional, Set
+
+from backend.cache import canonical_json
+
+# Per-role cap on responsibilities/achievements sent to the match model (0 keeps all)
+MATCH_MAX_BULLETS = int(os.getenv("MATCH_MAX_BULLETS", "6"))
+
+_WORD_RE = re.compile(r"[a-z0-9+#]{3,}")
+_STOPWORDS = frozenset(
+    "and the for with our you your are will have has who that this from into their "
+    "about able work working team role job years year experience strong".split()
+)
+
+
+def prune_empty(value: Any) -> Any:
+    """Recursively drop None, empty strings, empty lists and empty objects"""
+    if isinstance(value, dict):
+        pruned = {k: prune_empty(v) for k, v in value.items()}
+        return {k: v for k, v in pruned.items() if not _is_empty(v)}
+    if isinstance(value, list):
+        pruned = [prune_empty(v) for v in value]
+        return [v for v in pruned if not _is_empty(v)]
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+
+def _words(text: str) -> Set[str]:
+    return {w[:6] for w in _WORD_RE.findall(text.lower()) if w not in _STOPWORDS}
+
+
+def _most_relevant(items: List[Any], jd_words: Set[str], limit: int) -> List[Any]:
+    """Keep the ``limit`` items sharing most words with the JD, in original order"""
+    if len(items) <= limit:
+        return items
+    scored = sorted(
+        range(len(items)),
+        key=lambda i: (-len(_words(str(items[i])) & jd_words), i),
+    )
+    keep = sorted(scored[:limit])
+    return [items[i] for i in keep]
+
+
+def compact_resume(resume_details: dict, job_description: Optional[str] = None,
+                   max_bullets: int = MATCH_MAX_BULLETS) -> dict:
+    """Smallest faithful form of ResumeDetails for the match prompt.
+
+    Empty fields are removed and, when a job description is given, long
+    responsibility/achievement lists are shortened to the most relevant items.
+    """
+    compact = prune_empty(resume_details)
+    if job_description and max_bullets > 0:
+        jd_words = _words(job_description)
+        for job in compact.get("work_experience", []):
+            if not isinstance(job, dict):
+                continue
+            for field in ("responsibilities", "achievements"):
+                if isinstance(job.get(field), list):
+                    job[field] = _most_relevant(job[field], jd_words, max_bullets)
+    return compact
+
+
+def canonical_resume_json(resume_details: dict, job_description: Optional[str] = None) -> str:
+    """Minified, key-sorted JSON of the compact resume; also used as the cache key"""
+    return canonical_json(compact_resume(resume_details, job_description))
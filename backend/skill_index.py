@@ -0,0 +1,227 @@
+import re
+import threading
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from backend.prescreen import normalize_skill
+
+_EMPTY = np.empty(0, dtype=np.int64)
+_YEAR_RE = re.compile(r"(19|20)\d{2}")
+_CURRENT_RE = re.compile(r"present|current|now|ongoing", re.IGNORECASE)
+
+
+def normalize_term(value: str) -> str:
+    """Canonical form of a skill/certification/language for indexing and queries"""
+    canonical = normalize_skill(value)
+    if canonical is not None:
+        return canonical
+    return re.sub(r"\s+", " ", value.strip().lower())
+
+
+def indexed_terms(resume_details: dict) -> Set[str]:
+    """Normalized skills, certifications, languages and project technologies"""
+    values: List[str] = []
+    for field in ("technical_skills", "certifications", "languages"):
+        values.extend(str(v) for v in resume_details.get(field) or [])
+    for project in resume_details.get("projects") or []:
+        if isinstance(project, dict):
+            values.extend(str(v) for v in project.get("technologies") or [])
+    return {term for term in (normalize_term(v) for v in values) if term}
+
+
+def years_of_experience(resume_details: dict) -> float:
+    """Total years across work_experience, merging overlapping roles"""
+    this_year = date.today().year
+    spans: List[Tuple[int, int]] = []
+    for job in resume_details.get("work_experience") or []:
+        if not isinstance(job, dict):
+            continue
+        start = _YEAR_RE.search(str(job.get("start_date") or ""))
+        end_text = str(job.get("end_date") or "")
+        end = _YEAR_RE.search(end_text)
+        if start is None:
+            continue
+        start_year = int(start.group(0))
+        if end is not None:
+            end_year = int(end.group(0))
+        elif _CURRENT_RE.search(end_text) or not end_text:
+            end_year = this_year
+        else:
+            continue
+        if end_year >= start_year:
+            spans.append((start_year, end_year))
+
+    total = 0
+    current_start = current_end = None
+    for start_year, end_year in sorted(spans):
+        if current_end is None or start_year > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start_year, end_year
+        else:
+            current_end = max(current_end, end_year)
+    if current_end is not None:
+        total += current_end - current_start
+    return float(total)
+
+
+class QueryError(ValueError):
+    pass
+
+
+class SkillIndex:
+    """Inverted index from normalized skill terms to sorted candidate id arrays.
+
+    Supports boolean queries such as ``kafka AND (terraform OR ansible) AND NOT php``;
+    multi-word terms are quoted, e.g. ``"spring boot"``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings: Dict[str, np.ndarray] = {}
+        self._doc_terms: Dict[int, Set[str]] = {}
+        self._years: Dict[int, float] = {}
+        self._all = _EMPTY
+
+    def rebuild(self, candidates: Iterable[dict]) -> None:
+        """Rebuild from stored candidates (dicts with ``id`` and ``resume_details``)"""
+        postings: Dict[str, List[int]] = {}
+        doc_terms: Dict[int, Set[str]] = {}
+        years: Dict[int, float] = {}
+        for candidate in candidates:
+            candidate_id = candidate["id"]
+            details = candidate["resume_details"]
+            terms = indexed_terms(details)
+            doc_terms[candidate_id] = terms
+            years[candidate_id] = years_of_experience(details)
+            for term in terms:
+                postings.setdefault(term, []).append(candidate_id)
+        with self._lock:
+            self._postings = {
+                term: np.unique(np.asarray(ids, dtype=np.int64))
+                for term, ids in postings.items()
+            }
+            self._doc_terms = doc_terms
+            self._years = years
+            self._all = np.asarray(sorted(doc_terms), dtype=np.int64)
+
+    def add(self, candidate_id: int, resume_details: dict) -> None:
+        """Index (or re-index) one candidate"""
+        terms = indexed_terms(resume_details)
+        with self._lock:
+            self._remove_locked(candidate_id)
+            for term in terms:
+                self._postings[term] = _insert(self._postings.get(term, _EMPTY), candidate_id)
+            self._doc_terms[candidate_id] = terms
+            self._years[candidate_id] = years_of_experience(resume_details)
+            self._all = _insert(self._all, candidate_id)
+
+    def remove(self, candidate_id: int) -> None:
+        with self._lock:
+            self._remove_locked(candidate_id)
+
+    def _remove_locked(self, candidate_id: int) -> None:
+        for term in self._doc_terms.pop(candidate_id, ()):
+            remaining = self._postings[term][self._postings[term] != candidate_id]
+            if remaining.size:
+                self._postings[term] = remaining
+            else:
+                del self._postings[term]
+        self._years.pop(candidate_id, None)
+        self._all = self._all[self._all != candidate_id]
+
+    def search(self, query: Optional[str] = None,
+               min_years: Optional[float] = None) -> np.ndarray:
+        """Candidate ids matching the boolean query and experience filter"""
+        with self._lock:
+            ids = _QueryParser(query, self).parse() if query and query.strip() else self._all
+            if min_years is not None and ids.size:
+                years = np.fromiter(
+                    (self._years.get(int(i), 0.0) for i in ids), dtype=np.float32, count=ids.size
+                )
+                ids = ids[years >= min_years]
+        return ids
+
+    def years(self, candidate_id: int) -> float:
+        return self._years.get(candidate_id, 0.0)
+
+    def terms(self, candidate_id: int) -> Set[str]:
+        return self._doc_terms.get(candidate_id, set())
+
+    def posting(self, term: str) -> np.ndarray:
+        return self._postings.get(normalize_term(term), _EMPTY)
+
+    def __len__(self) -> int:
+        return int(self._all.size)
+
+
+def _insert(array: np.ndarray, value: int) -> np.ndarray:
+    position = int(np.searchsorted(array, value))
+    if position < array.size and array[position] == value:
+        return array
+    return np.insert(array, position, value)
+
+
+_QUERY_TOKEN_RE = re.compile(r'\(|\)|"[^"]*"|[^\s()]+')
+
+
+class _QueryParser:
+    """Recursive-descent parser; adjacent terms without an operator are ANDed"""
+
+    def __init__(self, query: str, index: SkillIndex):
+        self.tokens = _QUERY_TOKEN_RE.findall(query)
+        self.position = 0
+        self.index = index
+
+    def parse(self) -> np.ndarray:
+        result = self._or()
+        if self.position != len(self.tokens):
+            raise QueryError(f"Unexpected token: {self.tokens[self.position]}")
+        return result
+
+    def _peek(self) -> Optional[str]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def _take(self) -> str:
+        token = self._peek()
+        if token is None:
+            raise QueryError("Unexpected end of query")
+        self.position += 1
+        return token
+
+    def _or(self) -> np.ndarray:
+        result = self._and()
+        while self._peek() is not None and self._peek().upper() == "OR":
+            self._take()
+            result = np.union1d(result, self._and())
+        return result
+
+    def _and(self) -> np.ndarray:
+        result = self._not()
+        while self._peek() is not None and self._peek() != ")" and self._peek().upper() != "OR":
+            if self._peek().upper() == "AND":
+                self._take()
+            result = np.intersect1d(result, self._not(), assume_unique=True)
+        return result
+
+    def _not(self) -> np.ndarray:
+        if self._peek() is not None and self._peek().upper() == "NOT":
+            self._take()
+            return np.setdiff1d(self.index._all, self._not(), assume_unique=True)
+        return self._atom()
+
+    def _atom(self) -> np.ndarray:
+        token = self._take()
+        if token == "(":
+            result = self._or()
+            if self._take() != ")":
+                raise QueryError("Missing closing parenthesis")
+            return result
+        if token == ")" or token.upper() in ("AND", "OR"):
+            raise QueryError(f"Unexpected token: {token}")
+        return self.index._postings.get(normalize_term(token.strip('"')), _EMPTY)
+
+
+skill_index = SkillIndex()
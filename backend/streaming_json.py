@@ -0,0 +1,122 @@
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+_INVALID = object()
+
+# An object starts with a brace at the beginning of a line, so a "{" inside a
+# sentence of prose before the JSON is not mistaken for it
+_OBJECT_START_RE = re.compile(r"^[ \t]*\{", re.MULTILINE)
+
+
+class IncrementalObjectParser:
+    """Parse a JSON object as it streams in, one chunk at a time.
+
+    ``feed`` returns the top-level ``(key, value)`` pairs whose values were
+    completed by that chunk, so a field such as ``match_percentage`` is
+    available long before the closing brace arrives. Text before the first
+    line that starts with ``{`` (e.g. prose or a markdown code fence) is
+    ignored, and if that text turns out not to be a JSON object the parser
+    starts over at the next one.
+    """
+
+    def __init__(self):
+        self.raw = ""
+        self.start: Optional[int] = None
+        self.search_from = 0
+        self.complete = False
+        self._reset()
+
+    @property
+    def buffer(self) -> str:
+        """Text of the object being parsed, from its opening brace"""
+        return "" if self.start is None else self.raw[self.start:]
+
+    def _reset(self) -> None:
+        self.position = 0
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.key_start: Optional[int] = None
+        self.value_start: Optional[int] = None
+        self.key: Optional[str] = None
+        self.fields: Dict[str, Any] = {}
+
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        self.raw += text
+        completed: List[Tuple[str, Any]] = []
+        while not self.complete:
+            if self.start is None and not self._find_start():
+                break
+            if self._scan(completed):
+                break
+            # Not a JSON object after all; try the next candidate
+            self.search_from = self.start + 1
+            self.start = None
+            self._reset()
+        return completed
+
+    def _find_start(self) -> bool:
+        match = _OBJECT_START_RE.search(self.raw, self.search_from)
+        if match is None:
+            # Only the last, unfinished line can still turn into a start
+            self.search_from = max(self.search_from, self.raw.rfind("\n") + 1)
+            return False
+        self.start = self.position = match.end() - 1
+        return True
+
+    def _scan(self, completed: List[Tuple[str, Any]]) -> bool:
+        """Advance over the buffered text; False on a parse error"""
+        while self.position < len(self.raw) and not self.complete:
+            char = self.raw[self.position]
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char in "{[":
+                if self.depth == 0:
+                    self.key_start = self.position + 1
+                self.depth += 1
+            elif char in "}]":
+                self.depth -= 1
+                if self.depth == 0:
+                    if not self._finish_field(completed):
+                        return False
+                    self.complete = True
+            elif self.depth == 1 and char == ":" and self.value_start is None:
+                key = self._load(self.raw[self.key_start:self.position])
+                if not isinstance(key, str):
+                    return False
+                self.key = key
+                self.value_start = self.position + 1
+            elif self.depth == 1 and char == ",":
+                if self.value_start is None or not self._finish_field(completed):
+                    return False
+                self.key_start = self.position + 1
+            self.position += 1
+        return True
+
+    def _finish_field(self, completed: List[Tuple[str, Any]]) -> bool:
+        if self.value_start is None:
+            # Only whitespace may close an object without a value, as in "{}"
+            return not self.raw[self.key_start:self.position].strip()
+        value = self._load(self.raw[self.value_start:self.position])
+        if value is _INVALID:
+            return False
+        self.fields[self.key] = value
+        completed.append((self.key, value))
+        self.key = None
+        self.value_start = None
+        return True
+
+    @staticmethod
+    def _load(raw: str) -> Any:
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return _INVALID
@@ -0,0 +1,195 @@
+import json
+import os
+from typing import List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+
+from backend.llm_scheduler import create_chat_completion
+from backend.metrics import STAGE_SECONDS
+
+# Ask for JSON mode (response_format=json_object); set to 0 for endpoints without it
+LLM_JSON_MODE = os.getenv("LLM_JSON_MODE", "1") == "1"
+
+_CONTINUE_PROMPT = (
+    "Your previous reply was cut off. Continue the JSON exactly where it stopped. "
+    "Output only the remaining characters, without repeating anything."
+)
+
+
+class StructuredOutputError(Exception):
+    """The model's reply could not be turned into the expected JSON object"""
+
+    def __init__(self, message: str, raw: str):
+        super().__init__(message)
+        self.raw = raw
+
+
+def extract_json_object(text: str) -> Optional[str]:
+    """The outermost JSON object in ``text`` (to the end if it is never closed),
+    ignoring code fences and prose around it"""
+    start = text.find("{")
+    if start < 0:
+        return None
+    depth = 0
+    in_string = escaped = False
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            depth += 1
+        elif char in "}]":
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return text[start:]
+
+
+def repair_json(text: str) -> Tuple[str, bool]:
+    """Fix trailing commas and close a truncated object.
+
+    Returns the repaired text and whether it had to be truncated/closed. A
+    partially written last field is dropped rather than guessed: the text is
+    cut back to the end of the last complete value, so an unterminated
+    string or a trailing bare number (which may have been cut short) is
+    never kept.
+    """
+    out: List[str] = []
+    closers: List[str] = []
+    # (length of out, open closers) after each complete value: a safe place to cut
+    safe: List[Tuple[int, Tuple[str, ...]]] = []
+    in_string = escaped = string_is_value = False
+    # Last non-whitespace character outside strings (a string counts as '"')
+    last = ""
+    for char in text:
+        if in_string:
+            out.append(char)
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+                last = char
+                if string_is_value:
+                    safe.append((len(out), tuple(closers)))
+            continue
+        if char == '"':
+            # A string is a value in an array or after a colon; otherwise it is a key
+            string_is_value = last == ":" or bool(closers and closers[-1] == "]")
+            in_string = True
+        elif char in "{[":
+            closers.append("}" if char == "{" else "]")
+            last = char
+            out.append(char)
+            safe.append((len(out), tuple(closers)))
+            continue
+        elif char in "}]":
+            # Drop a trailing comma before the closing bracket
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()
+            if closers:
+                closers.pop()
+            last = char
+            out.append(char)
+            safe.append((len(out), tuple(closers)))
+            if not closers:
+                return "".join(out), False
+            continue
+        elif char == ",":
+            safe.append((len(out), tuple(closers)))
+        if not char.isspace():
+            last = char
+        out.append(char)
+
+    # Truncated: cut back to the last complete value and close what is open
+    candidate = ""
+    for length, open_closers in reversed(safe):
+        candidate = "".join(out[:length]).rstrip().rstrip(",") + "".join(reversed(open_closers))
+        try:
+            json.loads(candidate)
+            return candidate, True
+        except ValueError:
+            continue
+    return candidate, True
+
+
+def parse_structured(text: str, model_cls: Type[BaseModel]) -> Optional[dict]:
+    """Validated dict from a complete model reply, or None if it cannot be used.
+
+    Fields the model did not produce are not filled in with defaults. Small
+    syntax slips such as trailing commas are repaired, but a reply that was
+    cut off, or that does not match the schema, is rejected rather than
+    returned partially or unvalidated.
+    """
+    with STAGE_SECONDS.time(stage="json_parse"):
+        return _parse_structured(text, model_cls)
+
+
+def _parse_structured(text: str, model_cls: Type[BaseModel]) -> Optional[dict]:
+    raw = extract_json_object(text)
+    if raw is None:
+        return None
+    try:
+        return model_cls.model_validate_json(raw).model_dump(exclude_unset=True)
+    except ValidationError:
+        pass
+
+    repaired, truncated = repair_json(raw)
+    if truncated:
+        return None
+    try:
+        return model_cls.model_validate_json(repaired).model_dump(exclude_unset=True)
+    except ValidationError:
+        return None
+
+
+async def complete_structured(
+    model_cls: Type[BaseModel], messages: List[dict], **kwargs
+) -> dict:
+    """Chat completion parsed into ``model_cls``.
+
+    Uses JSON mode where enabled and repairs small syntax slips locally. A
+    reply cut off at the token limit (``finish_reason == "length"``) gets one
+    continuation request; any reply that still cannot be validated raises
+    ``StructuredOutputError``, so it is never cached.
+    """
+    if LLM_JSON_MODE:
+        kwargs.setdefault("response_format", {"type": "json_object"})
+    response = await create_chat_completion(messages=messages, **kwargs)
+    choice = response.choices[0]
+    text = (choice.message.content or "").strip()
+    if choice.finish_reason != "length":
+        result = parse_structured(text, model_cls)
+        if result is None:
+            raise StructuredOutputError(f"Could not parse {model_cls.__name__} from the reply", text)
+        return result
+
+    # One targeted continuation of the cut-off reply (free-form, so the model
+    # can append to the partial object instead of starting a new one)
+    kwargs.pop("response_format", None)
+    response = await create_chat_completion(
+        messages=messages + [
+            {"role": "assistant", "content": text},
+            {"role": "user", "content": _CONTINUE_PROMPT},
+        ],
+        **kwargs,
+    )
+    choice = response.choices[0]
+    continuation = (choice.message.content or "").lstrip()
+    if continuation.startswith("```"):
+        continuation = continuation.split("\n", 1)[-1]
+    continued = text + continuation
+    result = parse_structured(continued, model_cls) if choice.finish_reason != "length" else None
+    if result is None:
+        raise StructuredOutputError(f"Could not parse {model_cls.__name__} from the reply", continued)
+    return result
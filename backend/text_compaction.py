@@ -0,0 +1,184 @@
+import math
+import os
+import re
+from collections import Counter
+from typing import Dict, List, Set, Tuple
+
+RESUME_TOKEN_BUDGET = int(os.getenv("RESUME_TOKEN_BUDGET", "5000"))
+
+# Page separator emitted by the PDF parser
+PAGE_BREAK = "\f"
+
+# Section headings in keep-first order; text before the first heading
+# (name, contact details) always has the highest priority
+SECTION_PRIORITY: List[Tuple[str, Tuple[str, ...]]] = [
+    ("experience", ("experience", "work experience", "professional experience",
+                    "employment", "employment history", "work history", "career history")),
+    ("skills", ("skills", "technical skills", "core competencies", "competencies",
+                "technologies", "tools", "key skills")),
+    ("education", ("education", "academic background", "qualifications")),
+    ("summary", ("summary", "professional summary", "profile", "about me",
+                 "objective", "career objective")),
+    ("certifications", ("certifications", "certificates", "licenses", "licenses and certifications")),
+    ("projects", ("projects", "personal projects", "key projects")),
+    ("languages", ("languages",)),
+    ("awards", ("awards", "honors", "achievements", "awards and honors")),
+    ("publications", ("publications", "research", "patents")),
+    ("volunteering", ("volunteering", "volunteer experience", "community")),
+    ("interests", ("interests", "hobbies", "hobbies and interests")),
+    ("references", ("references", "referees")),
+]
+
+_HEADINGS: Dict[str, int] = {
+    heading: rank for rank, (_, headings) in enumerate(SECTION_PRIORITY) for heading in headings
+}
+# Lines that are only a page number ("3", "Page 3", "3 of 5", "3/5", "- 3 -");
+# bare numbers stop at three digits so a year like "2015" is never taken for one
+_PAGE_NUMBER_RE = re.compile(
+    r"^(page\s*\d+|\d{1,3})(\s*(of|/)\s*\d+)?$|^-\s*\d{1,3}\s*-$", re.IGNORECASE
+)
+# Page references inside a running header/footer ("Jane Doe - Page 2 of 3")
+_PAGE_REF_RE = re.compile(r"\bpage\s*\d+(\s*(of|/)\s*\d+)?\b", re.IGNORECASE)
+# Only this many lines at the top and bottom of a page count as header/footer
+EDGE_LINES = 3
+# A letters-only word broken at a line end before a lowercase continuation;
+# digits are excluded so ranges like "2019-\npresent" are left alone
+_HYPHEN_BREAK_RE = re.compile(r"\b([^\W\d_]+)-\n[ \t]*([a-z])")
+# Words that usually start a real hyphenated compound ("full-stack", "self-taught")
+_COMPOUND_PREFIXES = frozenset(
+    "anti co cross cutting data end fast full high hands in long low many mid multi "
+    "near non off on one open part post pre real right self semi short small start "
+    "state time top two user well world".split()
+)
+_SPACES_RE = re.compile(r"[ \t ]+")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough LLM token count (about four characters per token for English)"""
+    return math.ceil(len(text) / 4)
+
+
+def _line_key(line: str) -> str:
+    # Page numbers vary between repeated footers ("Page 1", "Page 2"); other digits are content
+    return _PAGE_REF_RE.sub("page #", line.strip().lower())
+
+
+def _page_numbers(lines: List[str]) -> Set[int]:
+    """Indexes of page-number lines among the first and last few lines of a page"""
+    filled = [i for i, line in enumerate(lines) if line.strip()]
+    edges = filled[:EDGE_LINES] + filled[-EDGE_LINES:]
+    return {i for i in edges if _PAGE_NUMBER_RE.match(lines[i].strip())}
+
+
+def _edges(lines: List[str], skip: Set[int]) -> Tuple[List[int], List[int]]:
+    """Indexes of the first and last ``EDGE_LINES`` non-blank lines of a page,
+    the bottom ones counted upwards from the last line"""
+    filled = [i for i, line in enumerate(lines) if line.strip() and i not in skip]
+    return filled[:EDGE_LINES], filled[::-1][:EDGE_LINES]
+
+
+def remove_repeated_lines(pages: List[str]) -> List[str]:
+    """Drop running headers/footers and page numbers.
+
+    Only the first and last few lines of each page are considered: a line is
+    a header (or footer) when it sits at the same place at the top (or
+    bottom) of most pages, and of at least three. Shorter documents only lose
+    their page numbers.
+    Repeats in the body of the page, such as a date range or a skill, are kept,
+    and so is the first copy of each header.
+    """
+    split_pages = [page.split("\n") for page in pages]
+    repeated: Dict[str, Set[Tuple[int, str]]] = {"top": set(), "bottom": set()}
+    # With only two pages, a content line can sit at the same edge of both by chance
+    if len(pages) >= 3:
+        seen = {"top": Counter(), "bottom": Counter()}
+        for lines in split_pages:
+            top, bottom = _edges(lines, _page_numbers(lines))
+            seen["top"].update({(n, _line_key(lines[i])) for n, i in enumerate(top)})
+            seen["bottom"].update({(n, _line_key(lines[i])) for n, i in enumerate(bottom)})
+        threshold = max(3, math.ceil(len(pages) * 0.6))
+        for edge, counts in seen.items():
+            repeated[edge] = {key for key, count in counts.items() if count >= threshold}
+
+    # The first copy of a running header is kept: it is often the candidate's name
+    kept_once = set()
+    cleaned = []
+    for lines in split_pages:
+        drop = _page_numbers(lines)
+        top, bottom = _edges(lines, drop)
+        for edge, indexes in (("top", top), ("bottom", bottom)):
+            for n, i in enumerate(indexes):
+                key = (n, _line_key(lines[i]))
+                if key in repeated[edge]:
+                    if edge == "bottom" or key in kept_once:
+                        drop.add(i)
+                    kept_once.add(key)
+        cleaned.append("\n".join(line for i, line in enumerate(lines) if i not in drop))
+    return cleaned
+
+
+def normalize_whitespace(text: str) -> str:
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    text = _SPACES_RE.sub(" ", text)
+    text = "\n".join(line.strip() for line in text.split("\n"))
+    return _BLANK_LINES_RE.sub("\n\n", text).strip()
+
+
+def _rejoin(match: "re.Match[str]") -> str:
+    word, rest = match.group(1), match.group(2)
+    if word[0].isupper() or word.lower() in _COMPOUND_PREFIXES:
+        # Probably a real compound ("Full-stack", "cross-functional"): keep the hyphen
+        return f"{word}-{rest}"
+    return word + rest
+
+
+def dehyphenate(text: str) -> str:
+    """Rejoin words split across lines ("develop-\\nment" -> "development")"""
+    return _HYPHEN_BREAK_RE.sub(_rejoin, text)
+
+
+def split_sections(text: str) -> List[Tuple[int, str]]:
+    """Split text at recognised headings into (priority rank, text) pairs in order"""
+    sections: List[Tuple[int, List[str]]] = [(-1, [])]
+    for line in text.split("\n"):
+        heading = line.strip().rstrip(":").lower()
+        if heading in _HEADINGS and len(line) < 60:
+            sections.append((_HEADINGS[heading], [line]))
+        else:
+            sections[-1][1].append(line)
+    return [(rank, "\n".join(lines).strip()) for rank, lines in sections if any(l.strip() for l in lines)]
+
+
+def trim_to_budget(text: str, token_budget: int) -> str:
+    """Cut lowest-priority sections first until the text fits the budget"""
+    if estimate_tokens(text) <= token_budget:
+        return text
+    sections = split_sections(text)
+    kept = list(sections)
+    for rank, section in sorted(sections, key=lambda s: s[0], reverse=True):
+        if estimate_tokens("\n\n".join(s for _, s in kept)) <= token_budget:
+            break
+        if rank == -1 or len(kept) == 1:
+            continue
+        kept.remove((rank, section))
+    result = "\n\n".join(s for _, s in kept)
+    # Still over (e.g. one huge experience section): hard cut at the budget
+    return result[:token_budget * 4]
+
+
+def compact_resume_text(text: str, token_budget: int = RESUME_TOKEN_BUDGET) -> Tuple[str, dict]:
+    """Clean raw resume text and fit it into the extraction token budget.
+
+    Returns the compacted text and token statistics for the response.
+    """
+    original_tokens = estimate_tokens(text)
+    pages = remove_repeated_lines(text.split(PAGE_BREAK))
+    compacted = dehyphenate(normalize_whitespace("\n".join(pages)))
+    compacted = trim_to_budget(compacted, token_budget)
+    compacted_tokens = estimate_tokens(compacted)
+    return compacted, {
+        "original_tokens": original_tokens,
+        "compacted_tokens": compacted_tokens,
+        "tokens_saved": original_tokens - compacted_tokens,
+    }
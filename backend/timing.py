@@ -0,0 +1,73 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+# Stage durations (seconds) of the request being served. Tasks started by the
+# request inherit the same dict, so parallel stages are recorded too.
+_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+_started: ContextVar[float] = ContextVar("request_started", default=0.0)
+
+
+def add_timing(name: str, seconds: float) -> None:
+    """Add ``seconds`` to a stage of the current request (no-op outside a request)"""
+    timings = _timings.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_timing(name, time.perf_counter() - start)
+
+
+def request_timings() -> Dict[str, float]:
+    """Milliseconds per stage so far, plus ``total`` since the request arrived.
+
+    Stages can overlap (e.g. the JD analysis runs while the resume is parsed)
+    and a stage repeated within a request is summed.
+    """
+    timings = dict(_timings.get() or {})
+    if _started.get():
+        timings["total"] = time.perf_counter() - _started.get()
+    return {name: round(seconds * 1000, 1) for name, seconds in timings.items()}
+
+
+def server_timing(timings: Dict[str, float]) -> str:
+    """``Server-Timing`` header value for millisecond stage durations"""
+    return ", ".join(f"{name};dur={duration}" for name, duration in timings.items())
+
+
+class ServerTimingMiddleware:
+    """Collects stage durations per request and sends them as a ``Server-Timing`` header.
+
+    Streamed responses only report the stages finished before their headers.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_timings(message):
+            if message["type"] == "http.response.start":
+                header = server_timing(request_timings()).encode("latin-1")
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"server-timing", header)
+                ]
+            await send(message)
+
+        timings_token = _timings.set({})
+        started_token = _started.set(time.perf_counter())
+        try:
+            await self.app(scope, receive, send_with_timings)
+        finally:
+            _timings.reset(timings_token)
+            _started.reset(started_token)
@@ -0,0 +1,399 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+VECTOR_DIR = Path(os.getenv("VECTOR_DIR", "data/vectors"))
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "256"))
+IVF_MIN_ROWS = int(os.getenv("IVF_MIN_ROWS", "20000"))
+IVF_NPROBE = int(os.getenv("IVF_NPROBE", "8"))
+# Re-embed the pool at startup once it has grown (or shrunk) by this factor
+# since vectors were last computed, as their IDF weights have drifted
+VECTOR_REEMBED_FACTOR = float(os.getenv("VECTOR_REEMBED_FACTOR", "2"))
+
+# Document-frequency buckets for IDF, and non-zero dimensions per hashed feature
+_DF_BUCKETS = 1 << 18
+_PROJECTION_NNZ = 8
+_STEM_LENGTH = 6
+
+_WORD_RE = re.compile(r"[a-z0-9+#]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in into is it its of on or our that the "
+    "their this to was we were which will with you your using used use etc also over "
+    "across within via per".split()
+)
+
+
+def _features(text: str) -> Dict[str, int]:
+    """Stemmed unigrams and bigrams with counts"""
+    words = [w[:_STEM_LENGTH] for w in _WORD_RE.findall(text.lower()) if w not in _STOPWORDS]
+    counts: Dict[str, int] = {}
+    for i, word in enumerate(words):
+        counts[word] = counts.get(word, 0) + 1
+        if i:
+            bigram = f"{words[i - 1]} {word}"
+            counts[bigram] = counts.get(bigram, 0) + 1
+    return counts
+
+
+def _feature_hash(feature: str) -> bytes:
+    return hashlib.blake2b(feature.encode("utf-8"), digest_size=2 * _PROJECTION_NNZ + 4).digest()
+
+
+def document_text(resume_details: dict) -> str:
+    """Summary, responsibilities, achievements and project descriptions"""
+    parts: List[str] = [resume_details.get("professional_summary") or ""]
+    for job in resume_details.get("work_experience") or []:
+        if isinstance(job, dict):
+            parts.append(job.get("title") or "")
+            parts.extend(job.get("responsibilities") or [])
+            parts.extend(job.get("achievements") or [])
+    for project in resume_details.get("projects") or []:
+        if isinstance(project, dict):
+            parts.append(project.get("description") or "")
+    return "\n".join(str(p) for p in parts if p)
+
+
+class HashingEmbedder:
+    """TF-IDF over hashed features, folded into a dense vector by sparse random projection.
+
+    Each feature hashes to ``_PROJECTION_NNZ`` signed dimensions of the output,
+    so no vocabulary or projection matrix is ever materialized and nothing is
+    fetched from the network.
+    """
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+        self.df = np.zeros(_DF_BUCKETS, dtype=np.int32)
+        self.documents = 0
+
+    def _hashed(self, features: Dict[str, int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        raw = np.frombuffer(b"".join(_feature_hash(f) for f in features),
+                            dtype=np.uint8).reshape(len(features), -1)
+        buckets = raw[:, :4].copy().view(np.uint32).ravel() % _DF_BUCKETS
+        lanes = raw[:, 4:].astype(np.int64)
+        dims = (lanes[:, 0::2] << 8 | lanes[:, 1::2]) % self.dim
+        signs = np.where(lanes[:, 0::2] & 1, 1.0, -1.0).astype(np.float32)
+        return buckets, dims, signs
+
+    def buckets(self, text: str) -> np.ndarray:
+        """Distinct IDF buckets of a document's features"""
+        features = _features(text)
+        if not features:
+            return np.empty(0, dtype=np.uint32)
+        return np.unique(self._hashed(features)[0])
+
+    def observe(self, buckets: np.ndarray, delta: int = 1) -> None:
+        """Add (or with ``delta=-1`` remove) a document from the IDF statistics"""
+        if not buckets.size:
+            return
+        np.add.at(self.df, buckets, delta)
+        self.documents = max(self.documents + delta, 0)
+
+    def embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        features = _features(text)
+        if not features:
+            return vector
+        buckets, dims, signs = self._hashed(features)
+        tf = 1.0 + np.log(np.fromiter(features.values(), dtype=np.float32, count=len(features)))
+        idf = np.log((1.0 + self.documents) / (1.0 + self.df[buckets])) + 1.0
+        weights = (tf * idf).astype(np.float32)
+        np.add.at(vector, dims.ravel(), (signs * weights[:, None]).ravel())
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class VectorIndex:
+    """Candidate embeddings in a memory-mapped float32 matrix with top-k search.
+
+    Brute force is used for small pools; once there are ``IVF_MIN_ROWS`` rows a
+    k-means partitioned (IVF) index is trained in a background thread and then
+    only the ``nprobe`` nearest partitions are scanned.
+
+    Each stored vector keeps the IDF weights of the moment it was embedded,
+    so weights drift as the pool changes; ``sync`` re-embeds everything once
+    the pool size has changed by ``VECTOR_REEMBED_FACTOR``. The index is only
+    written to disk by ``close``; after an unclean shutdown ``sync`` rebuilds
+    it from the candidate store.
+    """
+
+    def __init__(self, directory: Path = VECTOR_DIR, dim: int = EMBEDDING_DIM):
+        self.directory = directory
+        self.dim = dim
+        self.embedder = HashingEmbedder(dim)
+        self._lock = threading.Lock()
+        self._ids = np.empty(0, dtype=np.int64)
+        self._rows: Dict[int, int] = {}
+        # IDF buckets each candidate contributed, so removals can be undone
+        self._observed: Dict[int, np.ndarray] = {}
+        self._matrix: Optional[np.memmap] = None
+        self._centroids: Optional[np.ndarray] = None
+        self._assignments = np.empty(0, dtype=np.int32)
+        self._trained_rows = 0
+        self._training = False
+        self._embedded_documents = 0
+        self._dirty = False
+        self._needs_rebuild = False
+        self._load()
+
+    # Persistence
+
+    @property
+    def _matrix_path(self) -> Path:
+        return self.directory / "vectors.f32"
+
+    def _load(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        meta_path = self.directory / "meta.json"
+        if meta_path.exists():
+            meta = json.loads(meta_path.read_text())
+            clean = meta.get("clean") and (self.directory / "observed.npz").exists()
+            if meta.get("dim") == self.dim and not clean:
+                # Left by a run that did not shut down cleanly (or an older
+                # version): rows and statistics may not match, so rebuild
+                self._needs_rebuild = True
+            elif meta.get("dim") == self.dim:
+                self._ids = np.load(self.directory / "ids.npy")
+                self.embedder.df = np.load(self.directory / "df.npy")
+                self.embedder.documents = meta["documents"]
+                self._embedded_documents = meta["embedded_documents"]
+                self._rows = {int(c): row for row, c in enumerate(self._ids)}
+                with np.load(self.directory / "observed.npz") as observed:
+                    chunks = np.split(observed["buckets"], np.cumsum(observed["sizes"])[:-1])
+                self._observed = {int(c): chunk for c, chunk in zip(self._ids, chunks)}
+        self._open_matrix(max(len(self._ids), 1024))
+
+    def _open_matrix(self, capacity: int) -> None:
+        existing = self._matrix_path.stat().st_size // (4 * self.dim) \
+            if self._matrix_path.exists() else 0
+        if existing < capacity:
+            with open(self._matrix_path, "ab") as file:
+                file.truncate(capacity * self.dim * 4)
+        else:
+            capacity = existing
+        self._matrix = np.memmap(self._matrix_path, dtype=np.float32, mode="r+",
+                                 shape=(capacity, self.dim))
+
+    def _write_atomic(self, name: str, write) -> None:
+        """Write a file through a temporary file and rename, so readers never see half of it"""
+        path = self.directory / name
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as file:
+            write(file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp, path)
+
+    def _write_meta(self, clean: bool) -> None:
+        meta = json.dumps({
+            "dim": self.dim, "rows": int(self._ids.size), "documents": self.embedder.documents,
+            "embedded_documents": self._embedded_documents, "clean": clean,
+        })
+        self._write_atomic("meta.json", lambda file: file.write(meta.encode()))
+
+    def _mark_dirty(self) -> None:
+        # Record once that the files on disk are out of date until close()
+        if not self._dirty:
+            self._dirty = True
+            self._write_meta(clean=False)
+
+    def _save(self) -> None:
+        self._matrix.flush()
+        observed = [self._observed.get(int(c), np.empty(0, dtype=np.uint32)) for c in self._ids]
+        sizes = np.array([chunk.size for chunk in observed], dtype=np.int64)
+        buckets = np.concatenate(observed) if observed else np.empty(0, dtype=np.uint32)
+        self._write_atomic("ids.npy", lambda file: np.save(file, self._ids))
+        self._write_atomic("df.npy", lambda file: np.save(file, self.embedder.df))
+        self._write_atomic("observed.npz",
+                           lambda file: np.savez(file, sizes=sizes, buckets=buckets))
+        # Written last: the files only count as consistent once this says so
+        self._write_meta(clean=True)
+        self._dirty = False
+
+    def close(self) -> None:
+        """Write the index to disk (on shutdown)"""
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    # Updates
+
+    def add(self, candidate_id: int, resume_details: dict) -> None:
+        """Embed and store (or replace) one candidate"""
+        with self._lock:
+            self._mark_dirty()
+            self._add_locked(candidate_id, resume_details)
+            self._schedule_training_locked()
+
+    def _add_locked(self, candidate_id: int, resume_details: dict) -> None:
+        text = document_text(resume_details)
+        self._remove_locked(candidate_id)
+        buckets = self.embedder.buckets(text)
+        self.embedder.observe(buckets)
+        self._observed[candidate_id] = buckets
+        row = int(self._ids.size)
+        if row >= self._matrix.shape[0]:
+            self._matrix.flush()
+            self._open_matrix(self._matrix.shape[0] * 2)
+        self._matrix[row] = self.embedder.embed(text)
+        self._ids = np.append(self._ids, candidate_id)
+        self._rows[candidate_id] = row
+        if self._centroids is not None:
+            self._assignments = np.append(
+                self._assignments, int(np.argmax(self._centroids @ self._matrix[row]))
+            )
+
+    def remove(self, candidate_id: int) -> None:
+        with self._lock:
+            if candidate_id in self._rows:
+                self._mark_dirty()
+                self._remove_locked(candidate_id)
+
+    def _remove_locked(self, candidate_id: int) -> bool:
+        row = self._rows.pop(candidate_id, None)
+        if row is None:
+            return False
+        observed = self._observed.pop(candidate_id, None)
+        if observed is not None:
+            self.embedder.observe(observed, delta=-1)
+        last = int(self._ids.size) - 1
+        if row != last:
+            # Keep rows dense: move the last row into the freed slot
+            self._matrix[row] = self._matrix[last]
+            moved = int(self._ids[last])
+            self._ids[row] = moved
+            self._rows[moved] = row
+            if self._centroids is not None:
+                self._assignments[row] = self._assignments[last]
+        self._ids = self._ids[:last]
+        if self._centroids is not None:
+            self._assignments = self._assignments[:last]
+        return True
+
+    def _rebuild_locked(self, candidates: List[dict]) -> None:
+        """Recompute the IDF statistics and every vector from scratch"""
+        self.embedder.df[:] = 0
+        self.embedder.documents = 0
+        texts = [document_text(c["resume_details"]) for c in candidates]
+        observed = [self.embedder.buckets(text) for text in texts]
+        for buckets in observed:
+            self.embedder.observe(buckets)
+        if len(candidates) > self._matrix.shape[0]:
+            self._matrix.flush()
+            self._open_matrix(len(candidates))
+        for row, text in enumerate(texts):
+            self._matrix[row] = self.embedder.embed(text)
+        self._ids = np.array([c["id"] for c in candidates], dtype=np.int64)
+        self._rows = {int(c): row for row, c in enumerate(self._ids)}
+        self._observed = {int(c): buckets for c, buckets in zip(self._ids, observed)}
+        self._centroids = None
+        self._assignments = np.empty(0, dtype=np.int32)
+        self._embedded_documents = self.embedder.documents
+        self._needs_rebuild = False
+
+    def sync(self, candidates: Iterable[dict]) -> None:
+        """Reconcile with the candidate store: embed new rows and drop stale ones,
+        or re-embed everything when the stored state is unusable or has drifted"""
+        candidates = list(candidates)
+        wanted = {c["id"] for c in candidates}
+        with self._lock:
+            stale = [c for c in self._rows if c not in wanted]
+            missing = [c for c in candidates if c["id"] not in self._rows]
+            embedded = max(self._embedded_documents, 1)
+            drift = max(len(candidates) / embedded, embedded / max(len(candidates), 1))
+            if self._needs_rebuild or (self._rows and drift >= VECTOR_REEMBED_FACTOR):
+                self._rebuild_locked(candidates)
+                self._save()
+                self._schedule_training_locked()
+                return
+            first_fill = not self._rows
+            if stale or missing:
+                self._mark_dirty()
+            for candidate_id in stale:
+                self._remove_locked(candidate_id)
+            for candidate in missing:
+                self._add_locked(candidate["id"], candidate["resume_details"])
+            if first_fill:
+                self._embedded_documents = self.embedder.documents
+            self._schedule_training_locked()
+
+    # Search
+
+    def _schedule_training_locked(self) -> None:
+        """Train the IVF partitions in a background thread once the pool is large
+        enough, and again after it has grown by 20%; searches scan every row meanwhile"""
+        rows = int(self._ids.size)
+        if self._training or rows < IVF_MIN_ROWS:
+            return
+        if self._centroids is not None and rows <= self._trained_rows * 1.2:
+            return
+        self._training = True
+        snapshot = np.array(self._matrix[:rows])
+        threading.Thread(
+            target=self._train_ivf, args=(snapshot,), name="ivf-train", daemon=True
+        ).start()
+
+    def _train_ivf(self, data: np.ndarray, iterations: int = 10) -> None:
+        try:
+            rows = data.shape[0]
+            nlist = max(int(np.sqrt(rows)), 1)
+            rng = np.random.default_rng(0)
+            centroids = data[rng.choice(rows, nlist, replace=False)].copy()
+            for _ in range(iterations):
+                assignments = np.argmax(data @ centroids.T, axis=1)
+                for c in range(nlist):
+                    members = data[assignments == c]
+                    if members.size:
+                        centroid = members.mean(axis=0)
+                        norm = np.linalg.norm(centroid)
+                        centroids[c] = centroid / norm if norm else centroid
+            with self._lock:
+                # Rows may have moved while training, so assign the current ones
+                current = int(self._ids.size)
+                self._assignments = np.argmax(
+                    np.asarray(self._matrix[:current]) @ centroids.T, axis=1
+                ).astype(np.int32)
+                self._centroids = centroids
+                self._trained_rows = rows
+        except Exception as e:
+            print(f"Error training vector index partitions: {e}")
+        finally:
+            self._training = False
+
+    def search(self, text: str, top_k: int = 50,
+               nprobe: int = IVF_NPROBE) -> List[Tuple[int, float]]:
+        """Best ``top_k`` (candidate_id, cosine similarity) pairs for a query text"""
+        with self._lock:
+            rows = int(self._ids.size)
+            if rows == 0 or top_k < 1:
+                return []
+            query = self.embedder.embed(text)
+            if rows >= IVF_MIN_ROWS and self._centroids is not None:
+                probes = np.argsort(-(self._centroids @ query))[:nprobe]
+                candidates = np.flatnonzero(np.isin(self._assignments, probes))
+                scores = np.asarray(self._matrix[candidates]) @ query
+            else:
+                candidates = np.arange(rows)
+                scores = np.asarray(self._matrix[:rows]) @ query
+
+            k = min(top_k, scores.size)
+            if k == 0:
+                return []
+            best = np.argpartition(-scores, k - 1)[:k]
+            best = best[np.argsort(-scores[best])]
+            return [(int(self._ids[candidates[i]]), float(scores[i])) for i in best]
+
+    def __len__(self) -> int:
+        return int(self._ids.size)
+
+
+vector_index = VectorIndex()
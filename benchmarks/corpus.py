@@ -0,0 +1,177 @@
+"""Synthetic resumes (PDF, DOCX, TXT) of varied sizes for benchmarks.
+
+Generation is seeded, so the same arguments always produce the same corpus.
+
+    python -m benchmarks.corpus --out benchmarks/corpus --count 60 --formats pdf,docx,txt
+"""
+import argparse
+import io
+import json
+import random
+from pathlib import Path
+from typing import Dict, List
+
+import docx
+
+FIRST_NAMES = ["Ada", "Grace", "Linus", "Barbara", "Ken", "Margaret", "Dennis", "Frances",
+               "Guido", "Radia", "Tim", "Hedy", "Alan", "Katherine", "Bjarne", "Sophie"]
+LAST_NAMES = ["Lovelace", "Hopper", "Torvalds", "Liskov", "Thompson", "Hamilton", "Ritchie",
+              "Allen", "Rossum", "Perlman", "Berners", "Lamarr", "Kay", "Johnson", "Wilson"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Hooli", "Stark Industries",
+             "Wayne Enterprises", "Cyberdyne", "Soylent Systems", "Tyrell Corp"]
+TITLES = ["Software Engineer", "Senior Software Engineer", "Backend Engineer",
+          "Data Engineer", "Platform Engineer", "Staff Engineer", "DevOps Engineer"]
+SKILLS = ["Python", "Go", "Java", "TypeScript", "FastAPI", "Django", "Kafka", "Spark",
+          "PostgreSQL", "Redis", "Docker", "Kubernetes", "Terraform", "AWS", "GCP",
+          "Airflow", "React", "gRPC", "Elasticsearch", "Prometheus"]
+VERBS = ["Built", "Designed", "Led", "Migrated", "Scaled", "Automated", "Optimized",
+         "Maintained", "Introduced", "Rewrote"]
+OBJECTS = ["a streaming ingestion pipeline", "the billing service", "CI/CD for 40 services",
+           "the search backend", "a feature store", "the public REST API",
+           "observability dashboards", "the data warehouse", "an internal developer platform",
+           "multi-region failover"]
+RESULTS = ["cutting p95 latency by 40%", "saving $200k a year in compute",
+           "handling 5x peak traffic", "reducing incidents by half",
+           "shipping releases daily instead of weekly", "serving 2M users"]
+
+# Roles and bullets per role for each size
+SIZES = {"small": (1, 3), "medium": (3, 5), "large": (8, 9)}
+
+JOB_DESCRIPTION = (
+    "Senior Backend Engineer. We are looking for an engineer with 5+ years of experience "
+    "building Python services (FastAPI or Django) on AWS. Must have: Python, PostgreSQL, "
+    "Docker, AWS. Nice to have: Kafka, Terraform, Kubernetes. You will design and run "
+    "high-throughput APIs and data pipelines and mentor other engineers. BSc in "
+    "Computer Science or equivalent experience."
+)
+
+
+def resume_lines(rng: random.Random, size: str, index: int) -> List[str]:
+    """Plain-text lines of one synthetic resume"""
+    roles, bullets = SIZES[size]
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {index}"
+    skills = rng.sample(SKILLS, rng.randint(5, 12))
+    lines = [
+        name,
+        f"{name.split()[0].lower()}.{index}@example.com | +1 555 01{index % 100:02d}",
+        "",
+        "SUMMARY",
+        f"{rng.choice(TITLES)} with {roles * 2 + rng.randint(0, 4)} years of experience in "
+        f"{', '.join(skills[:3])}.",
+        "",
+        "EXPERIENCE",
+    ]
+    year = 2024
+    for _ in range(roles):
+        start = year - rng.randint(1, 4)
+        lines.append(f"{rng.choice(TITLES)}, {rng.choice(COMPANIES)} ({start} - {year})")
+        for _ in range(bullets):
+            lines.append(
+                f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} using {rng.choice(skills)}, "
+                f"{rng.choice(RESULTS)}"
+            )
+        lines.append("")
+        year = start
+    lines += [
+        "EDUCATION",
+        f"BSc Computer Science, State University ({year - 4})",
+        "",
+        "SKILLS",
+        ", ".join(skills),
+    ]
+    return lines
+
+
+def to_txt(lines: List[str]) -> bytes:
+    return "\n".join(lines).encode("utf-8")
+
+
+def to_docx(lines: List[str]) -> bytes:
+    document = docx.Document()
+    for line in lines:
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def to_pdf(lines: List[str], lines_per_page: int = 48, width: int = 95) -> bytes:
+    """Minimal multi-page PDF with Helvetica text (no dependency needed)"""
+    wrapped: List[str] = []
+    for line in lines:
+        while len(line) > width:
+            cut = line.rfind(" ", 0, width)
+            cut = cut if cut > 0 else width
+            wrapped.append(line[:cut])
+            line = "  " + line[cut:].lstrip()
+        wrapped.append(line)
+    pages = [wrapped[i:i + lines_per_page] for i in range(0, len(wrapped), lines_per_page)] or [[]]
+
+    kids = " ".join(f"{4 + 2 * i} 0 R" for i in range(len(pages)))
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, page in enumerate(pages):
+        text = " ".join(f"({_pdf_escape(line)}) '" for line in page)
+        stream = f"BT /F1 10 Tf 50 790 Td 15 TL {text} ET".encode("latin-1", "replace")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+WRITERS = {"txt": to_txt, "docx": to_docx, "pdf": to_pdf}
+
+
+def generate(out_dir: Path, count: int, formats: List[str], sizes: List[str],
+             seed: int = 42) -> List[Dict]:
+    """Write ``count`` resumes cycling through formats and sizes; returns the manifest"""
+    rng = random.Random(seed)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest = []
+    for index in range(count):
+        file_format = formats[index % len(formats)]
+        size = sizes[(index // len(formats)) % len(sizes)]
+        data = WRITERS[file_format](resume_lines(rng, size, index))
+        path = out_dir / f"resume_{index:04d}_{size}.{file_format}"
+        path.write_bytes(data)
+        manifest.append({"path": str(path), "format": file_format, "size": size,
+                         "bytes": len(data)})
+    (out_dir / "manifest.json").write_text(json.dumps(manifest, indent=2))
+    return manifest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--out", type=Path, default=Path("benchmarks/corpus"))
+    parser.add_argument("--count", type=int, default=60)
+    parser.add_argument("--formats", default="pdf,docx,txt")
+    parser.add_argument("--sizes", default="small,medium,large")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    manifest = generate(args.out, args.count, args.formats.split(","), args.sizes.split(","),
+                        args.seed)
+    print(f"Wrote {len(manifest)} resumes to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""OpenAI-compatible stand-in for the Groq API, for offline benchmarks.
+
+Answers ``POST /v1/chat/completions`` (plain and streamed) with canned JSON
+chosen from the system prompt, after a configurable latency, and injects
+429s and 5xx errors at configurable rates. ``GET /stats`` reports the calls
+received.
+
+    python -m benchmarks.fake_groq --port 9100 --latency lognormal:0.8:0.4 --rate-limit 0.05
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+from typing import Callable, Dict
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+RESUME = {
+    "contact_info": {"name": "Candidate", "email": "candidate@example.com"},
+    "professional_summary": "Backend engineer building data pipelines and APIs",
+    "work_experience": [{
+        "company": "Acme Corp",
+        "title": "Senior Software Engineer",
+        "start_date": "2019",
+        "end_date": "Present",
+        "responsibilities": [
+            "Built Kafka streaming pipelines in Python",
+            "Ran Kubernetes clusters on AWS with Terraform",
+        ],
+        "achievements": ["Cut p95 API latency by 40%"],
+    }],
+    "education": [{"degree": "BSc Computer Science", "institution": "State University"}],
+    "technical_skills": ["Python", "FastAPI", "Kafka", "Kubernetes", "AWS", "Terraform"],
+    "soft_skills": ["Mentoring"],
+    "certifications": ["AWS Certified Solutions Architect"],
+    "projects": [],
+    "languages": ["English"],
+    "awards": [],
+}
+
+JOB_ANALYSIS = {
+    "job_title": "Senior Backend Engineer",
+    "seniority": "senior",
+    "must_have_skills": ["Python", "FastAPI", "AWS"],
+    "nice_to_have_skills": ["Kafka", "Terraform"],
+    "min_years_experience": 5,
+    "education": ["BSc Computer Science"],
+    "certifications": [],
+    "responsibilities": ["Design and run backend services"],
+}
+
+TRIAGE = {
+    "match_percentage": 74,
+    "verdict": "MODERATE_MATCH",
+    "matching_skills": ["Python", "AWS"],
+    "missing_critical_requirements": [],
+    "summary": "Likely fit",
+}
+
+MATCH = {
+    "match_percentage": 78,
+    "verdict": "STRONG_MATCH",
+    "matching_skills": ["Python", "FastAPI", "AWS"],
+    "missing_critical_requirements": [],
+    "missing_preferred_skills": ["Go"],
+    "experience_assessment": "Seven years of relevant backend work",
+    "education_fit": "Meets the degree requirement",
+    "key_strengths": ["Streaming pipelines", "Cloud infrastructure"],
+    "gaps_to_address": ["No Go experience"],
+    "recommendations": ["Probe system design depth"],
+    "interview_likelihood": "HIGH",
+    "summary": "Strong backend candidate",
+}
+
+app = FastAPI(title="Fake Groq")
+
+config = {
+    "latency": lambda: 0.0,
+    "rate_limit": 0.0,
+    "server_error": 0.0,
+    "retry_after": 1.0,
+    "chunk_delay": 0.01,
+}
+stats: Counter = Counter()
+
+
+def parse_latency(spec: str) -> Callable[[], float]:
+    """Latency sampler from ``fixed:S``, ``uniform:LOW:HIGH``, ``normal:MEAN:SD``
+    or ``lognormal:MEDIAN:SIGMA`` (seconds)"""
+    kind, *values = spec.split(":")
+    args = [float(value) for value in values]
+    if kind == "fixed":
+        return lambda: args[0]
+    if kind == "uniform":
+        return lambda: random.uniform(args[0], args[1])
+    if kind == "normal":
+        return lambda: max(0.0, random.gauss(args[0], args[1]))
+    if kind == "lognormal":
+        return lambda: args[0] * random.lognormvariate(0, args[1])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+def canned_reply(messages: list) -> Dict:
+    """Response object for the prompt, with the resume's first line as the candidate
+    name so every synthetic resume gets distinct details (and match cache keys)"""
+    system = (messages[0].get("content") or "").lower() if messages else ""
+    if "resume parser" in system:
+        reply = json.loads(json.dumps(RESUME))
+        user = messages[-1].get("content") or ""
+        body = user.split("\n\n", 1)[-1].strip()
+        reply["contact_info"]["name"] = body.split("\n", 1)[0][:80] or "Candidate"
+        return reply
+    if "job description analyst" in system:
+        return JOB_ANALYSIS
+    if "triage" in system:
+        return TRIAGE
+    return MATCH
+
+
+def _usage(messages: list, content: str) -> Dict[str, int]:
+    prompt = sum(len(str(message.get("content") or "")) for message in messages) // 4
+    completion = len(content) // 4
+    return {"prompt_tokens": prompt, "completion_tokens": completion,
+            "total_tokens": prompt + completion}
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    model = body.get("model", "unknown")
+    stats["calls"] += 1
+    stats[f"model:{model}"] += 1
+
+    roll = random.random()
+    if roll < config["rate_limit"]:
+        stats["rate_limited"] += 1
+        return JSONResponse(
+            {"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded"}},
+            status_code=429,
+            headers={"retry-after": str(config["retry_after"])},
+        )
+    if roll < config["rate_limit"] + config["server_error"]:
+        stats["server_errors"] += 1
+        await asyncio.sleep(config["latency"]() / 2)
+        return JSONResponse({"error": {"message": "Service unavailable"}}, status_code=503)
+
+    await asyncio.sleep(config["latency"]())
+    messages = body.get("messages", [])
+    content = json.dumps(canned_reply(messages))
+    usage = _usage(messages, content)
+    created = int(time.time())
+
+    if body.get("stream"):
+        async def chunks():
+            for i in range(0, len(content), 16):
+                chunk = {
+                    "id": "chatcmpl-bench", "object": "chat.completion.chunk",
+                    "created": created, "model": model,
+                    "choices": [{"index": 0, "delta": {"content": content[i:i + 16]},
+                                 "finish_reason": None}],
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+                await asyncio.sleep(config["chunk_delay"])
+            # Groq reports usage on the last chunk under x_groq
+            last = {
+                "id": "chatcmpl-bench", "object": "chat.completion.chunk",
+                "created": created, "model": model,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                "x_groq": {"usage": usage},
+            }
+            yield f"data: {json.dumps(last)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(chunks(), media_type="text/event-stream")
+
+    return {
+        "id": "chatcmpl-bench",
+        "object": "chat.completion",
+        "created": created,
+        "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                     "finish_reason": "stop"}],
+        "usage": usage,
+    }
+
+
+@app.get("/stats")
+async def get_stats():
+    return dict(stats)
+
+
+@app.post("/stats/reset")
+async def reset_stats():
+    stats.clear()
+    return {"reset": True}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", default="lognormal:0.8:0.4",
+                        help="fixed:S, uniform:LOW:HIGH, normal:MEAN:SD or lognormal:MEDIAN:SIGMA")
+    parser.add_argument("--rate-limit", type=float, default=0.0,
+                        help="Fraction of calls answered with 429")
+    parser.add_argument("--server-error", type=float, default=0.0,
+                        help="Fraction of calls answered with 503")
+    parser.add_argument("--retry-after", type=float, default=1.0,
+                        help="Retry-After seconds sent with 429s")
+    parser.add_argument("--chunk-delay", type=float, default=0.01,
+                        help="Seconds between streamed chunks")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    config.update(
+        latency=parse_latency(args.latency),
+        rate_limit=args.rate_limit,
+        server_error=args.server_error,
+        retry_after=args.retry_after,
+        chunk_delay=args.chunk_delay,
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
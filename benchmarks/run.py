@@ -0,0 +1,463 @@
+"""Offline load benchmarks of the backend against the fake Groq server.
+
+Starts ``benchmarks.fake_groq`` and the API (with throwaway caches and
+stores), drives each scenario at each concurrency level and reports latency
+percentiles, throughput, backend CPU/memory and the per-stage timings from
+``/metrics``. Results are written as JSON; ``--compare`` diffs two runs.
+
+    python -m benchmarks.run --scenarios extract,analyze,batch --concurrency 1,8,32
+    python -m benchmarks.run --compare benchmarks/results/old.json benchmarks/results/new.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.corpus import JOB_DESCRIPTION, generate
+
+MIME_TYPES = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "txt": "text/plain",
+}
+SCENARIOS = ("extract", "analyze", "match", "batch")
+
+_METRIC_LINE = re.compile(r'^(resume_\w+?)_(sum|count)\{(\w+)="([^"]*)"\} (\S+)$')
+
+
+# Statistics
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    """Linearly interpolated percentile (``fraction`` in 0..1)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * fraction
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def latency_summary(latencies: List[float]) -> Dict[str, Optional[float]]:
+    def ms(value: Optional[float]) -> Optional[float]:
+        return None if value is None else round(value * 1000, 1)
+    return {
+        "p50": ms(percentile(latencies, 0.50)),
+        "p95": ms(percentile(latencies, 0.95)),
+        "p99": ms(percentile(latencies, 0.99)),
+        "mean": ms(sum(latencies) / len(latencies)) if latencies else None,
+        "max": ms(max(latencies)) if latencies else None,
+    }
+
+
+# Backend process CPU and memory (Linux /proc; None elsewhere)
+
+class ProcessMonitor:
+    """CPU seconds and resident memory of a process and its children (parser workers)"""
+
+    def __init__(self, pid: int, interval: float = 0.1):
+        self.pid = pid
+        self.interval = interval
+        self.available = Path(f"/proc/{pid}/stat").exists()
+        self._ticks = os.sysconf("SC_CLK_TCK") if self.available else 100
+        self._cpu: Dict[int, float] = {}
+        self._start_cpu: Dict[int, float] = {}
+        self.peak_rss = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def _pids(self) -> List[int]:
+        pids = [self.pid]
+        for stat in Path("/proc").glob("[0-9]*/stat"):
+            try:
+                fields = stat.read_text().rsplit(")", 1)[1].split()
+            except (OSError, IndexError):
+                continue
+            if int(fields[1]) == self.pid:
+                pids.append(int(stat.parent.name))
+        return pids
+
+    def _sample(self) -> int:
+        rss = 0
+        for pid in self._pids():
+            try:
+                fields = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()
+                status = Path(f"/proc/{pid}/status").read_text()
+            except OSError:
+                continue
+            # utime and stime are fields 14 and 15 of /proc/<pid>/stat
+            self._cpu[pid] = (int(fields[11]) + int(fields[12])) / self._ticks
+            match = re.search(r"VmRSS:\s+(\d+) kB", status)
+            rss += int(match.group(1)) * 1024 if match else 0
+        self.peak_rss = max(self.peak_rss, rss)
+        return rss
+
+    async def _run(self) -> None:
+        while True:
+            self._sample()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if not self.available:
+            return
+        self._sample()
+        self._start_cpu = dict(self._cpu)
+        self.peak_rss = 0
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self, elapsed: float) -> Optional[Dict[str, float]]:
+        if not self.available:
+            return None
+        self._task.cancel()
+        rss = self._sample()
+        cpu = sum(value - self._start_cpu.get(pid, 0.0) for pid, value in self._cpu.items())
+        return {
+            "cpu_seconds": round(cpu, 3),
+            "cpu_percent": round(cpu / elapsed * 100, 1) if elapsed else None,
+            "rss_peak_mb": round(self.peak_rss / 2 ** 20, 1),
+            "rss_end_mb": round(rss / 2 ** 20, 1),
+        }
+
+
+# Per-stage timings from /metrics
+
+async def stage_totals(client: httpx.AsyncClient) -> Dict[str, Tuple[float, float]]:
+    """(sum seconds, count) per stage, parse type and model from /metrics"""
+    response = await client.get("/metrics")
+    totals: Dict[str, List[float]] = {}
+    for line in response.text.splitlines():
+        match = _METRIC_LINE.match(line)
+        if not match:
+            continue
+        metric, kind, _, label, value = match.groups()
+        name = {
+            "resume_stage_duration_seconds": label,
+            "resume_parse_duration_seconds": f"parse_{label}",
+            "resume_llm_request_duration_seconds": f"llm_upstream:{label}",
+            "resume_llm_queue_wait_seconds": f"llm_queue:{label}",
+        }.get(metric)
+        if name is None:
+            continue
+        entry = totals.setdefault(name, [0.0, 0.0])
+        entry[0 if kind == "sum" else 1] = float(value)
+    return {name: (total, count) for name, (total, count) in totals.items()}
+
+
+def stage_deltas(before: Dict[str, Tuple[float, float]],
+                 after: Dict[str, Tuple[float, float]]) -> Dict[str, Dict[str, float]]:
+    stages = {}
+    for name, (total, count) in sorted(after.items()):
+        previous_total, previous_count = before.get(name, (0.0, 0.0))
+        calls = count - previous_count
+        if calls > 0:
+            stages[name] = {
+                "count": int(calls),
+                "mean_ms": round((total - previous_total) / calls * 1000, 2),
+            }
+    return stages
+
+
+# Scenarios: each sends one request using the documents from ``start`` on
+# and returns its HTTP status
+
+def _upload(entry: Dict) -> Tuple[str, bytes, str]:
+    path = Path(entry["path"])
+    return path.name, path.read_bytes(), MIME_TYPES[entry["format"]]
+
+
+async def run_extract(client: httpx.AsyncClient, corpus: List[Dict], start: int) -> int:
+    response = await client.post("/extract-resume",
+                                 files={"file": _upload(corpus[start % len(corpus)])})
+    return response.status_code
+
+
+async def run_analyze(client: httpx.AsyncClient, corpus: List[Dict], start: int) -> int:
+    response = await client.post(
+        "/analyze",
+        files={"file": _upload(corpus[start % len(corpus)])},
+        data={"job_description": JOB_DESCRIPTION},
+    )
+    return response.status_code
+
+
+async def run_match(client: httpx.AsyncClient, corpus: List[Dict], start: int) -> int:
+    # Resume details only; ``start`` keeps them (and their match cache keys) unique
+    details = {
+        "contact_info": {"name": f"Candidate {start}"},
+        "technical_skills": ["Python", "FastAPI", "AWS", "Kafka"],
+        "work_experience": [{
+            "company": "Acme Corp", "title": "Backend Engineer",
+            "start_date": "2018", "end_date": "Present",
+            "responsibilities": [f"Built service number {start}"],
+        }],
+    }
+    response = await client.post("/match-job", json={
+        "resume_details": details, "job_description": JOB_DESCRIPTION
+    })
+    return response.status_code
+
+
+def batch_runner(batch_size: int):
+    async def run_batch(client: httpx.AsyncClient, corpus: List[Dict], start: int) -> int:
+        files = [("files", _upload(corpus[(start + i) % len(corpus)])) for i in range(batch_size)]
+        async with client.stream("POST", "/analyze-batch", files=files,
+                                 data={"job_description": JOB_DESCRIPTION}) as response:
+            async for _ in response.aiter_lines():
+                pass
+            return response.status_code
+    return run_batch
+
+
+async def run_step(client: httpx.AsyncClient, monitor: ProcessMonitor, name: str, runner,
+                   corpus: List[Dict], concurrency: int, requests: int,
+                   first_document: int, items_per_request: int) -> Dict:
+    """Closed-loop load: ``concurrency`` workers send ``requests`` requests in total"""
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    queue: asyncio.Queue = asyncio.Queue()
+    for index in range(requests):
+        queue.put_nowait(first_document + index * items_per_request)
+
+    async def worker() -> None:
+        while not queue.empty():
+            document = queue.get_nowait()
+            start = time.perf_counter()
+            try:
+                status = str(await runner(client, corpus, document))
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    before = await stage_totals(client)
+    monitor.start()
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    resources = await monitor.stop(elapsed)
+    after = await stage_totals(client)
+
+    errors = sum(count for status, count in statuses.items() if status != "200")
+    return {
+        "scenario": name,
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "statuses": statuses,
+        "elapsed_s": round(elapsed, 3),
+        "rps": round(requests / elapsed, 2),
+        "items_per_s": round(requests * items_per_request / elapsed, 2),
+        "latency_ms": latency_summary(latencies),
+        "resources": resources,
+        "stages": stage_deltas(before, after),
+    }
+
+
+# Processes
+
+def _wait_until_up(url: str, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+
+
+def start_servers(args, workdir: Path) -> List[subprocess.Popen]:
+    fake = subprocess.Popen([
+        sys.executable, "-m", "benchmarks.fake_groq",
+        "--port", str(args.fake_port),
+        "--latency", args.latency,
+        "--rate-limit", str(args.rate_limit),
+        "--server-error", str(args.server_error),
+        "--seed", str(args.seed),
+    ])
+    _wait_until_up(f"http://127.0.0.1:{args.fake_port}/stats")
+
+    env = dict(os.environ)
+    env.update({
+        "GROQ_API_KEY": "benchmark",
+        "GROQ_BASE_URL": f"http://127.0.0.1:{args.fake_port}/v1",
+        "CACHE_DIR": str(workdir / "cache"),
+        "CANDIDATE_DB": str(workdir / "candidates.db"),
+        "VECTOR_DIR": str(workdir / "vectors"),
+        "JOB_DB": str(workdir / "jobs.db"),
+    })
+    env.update(dict(setting.split("=", 1) for setting in args.env))
+    backend = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app",
+         "--port", str(args.app_port), "--log-level", "warning"],
+        env=env,
+    )
+    _wait_until_up(f"http://127.0.0.1:{args.app_port}/health")
+    return [fake, backend]
+
+
+def stop_servers(processes: List[subprocess.Popen]) -> None:
+    for process in reversed(processes):
+        process.terminate()
+        try:
+            process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# Reporting
+
+def print_step(step: Dict) -> None:
+    latency = step["latency_ms"]
+    resources = step["resources"] or {}
+    print(
+        f"{step['scenario']:>8} c={step['concurrency']:<3} n={step['requests']:<4} "
+        f"err={step['errors']:<3} rps={step['rps']:<7} "
+        f"p50={latency['p50']}ms p95={latency['p95']}ms p99={latency['p99']}ms "
+        f"cpu={resources.get('cpu_percent')}% rss={resources.get('rss_peak_mb')}MB"
+    )
+    for stage, timing in step["stages"].items():
+        print(f"{'':>12}{stage:<40} n={timing['count']:<5} mean={timing['mean_ms']}ms")
+
+
+def compare(baseline_path: Path, current_path: Path) -> None:
+    """Print p95 latency and throughput changes between two result files"""
+    baseline = json.loads(baseline_path.read_text())
+    current = json.loads(current_path.read_text())
+    previous = {(step["scenario"], step["concurrency"]): step for step in baseline["steps"]}
+    print(f"{'scenario':>8} {'conc':>4} {'p95 ms':>18} {'rps':>18}")
+    for step in current["steps"]:
+        old = previous.get((step["scenario"], step["concurrency"]))
+        if old is None:
+            continue
+
+        def change(before: Optional[float], after: Optional[float]) -> str:
+            if not before or after is None:
+                return f"{after}"
+            return f"{before}->{after} ({(after - before) / before * 100:+.0f}%)"
+
+        print(f"{step['scenario']:>8} {step['concurrency']:>4} "
+              f"{change(old['latency_ms']['p95'], step['latency_ms']['p95']):>18} "
+              f"{change(old['rps'], step['rps']):>18}")
+
+
+async def run_benchmarks(args, corpus: List[Dict]) -> List[Dict]:
+    # Runner and resumes per request for each scenario
+    runners = {
+        "extract": (run_extract, 1),
+        "analyze": (run_analyze, 1),
+        "match": (run_match, 1),
+        "batch": (batch_runner(args.batch_size), args.batch_size),
+    }
+    steps = []
+    monitor = ProcessMonitor(args.backend_pid)
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=args.backend_url, timeout=600, limits=limits) as client:
+        offset = 0
+        for scenario in args.scenarios:
+            runner, items = runners[scenario]
+            requests = args.batches if scenario == "batch" else args.requests
+            for concurrency in args.concurrency:
+                step = await run_step(client, monitor, scenario, runner, corpus,
+                                      concurrency, requests, offset, items)
+                offset += requests * items
+                print_step(step)
+                steps.append(step)
+    return steps
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scenarios", default="extract,analyze,batch",
+                        help=f"Comma-separated: {', '.join(SCENARIOS)}")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated levels")
+    parser.add_argument("--requests", type=int, default=64, help="Requests per step")
+    parser.add_argument("--batches", type=int, default=4, help="Batch requests per step")
+    parser.add_argument("--batch-size", type=int, default=25, help="Resumes per batch request")
+    parser.add_argument("--formats", default="pdf,docx,txt")
+    parser.add_argument("--sizes", default="small,medium,large")
+    parser.add_argument("--latency", default="lognormal:0.8:0.4",
+                        help="Fake LLM latency distribution (see benchmarks.fake_groq)")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Fraction of 429s")
+    parser.add_argument("--server-error", type=float, default=0.0, help="Fraction of 503s")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--fake-port", type=int, default=9100)
+    parser.add_argument("--app-port", type=int, default=8100)
+    parser.add_argument("--env", action="append", default=[], metavar="NAME=VALUE",
+                        help="Extra backend setting, e.g. --env PARSER_WORKERS=0")
+    parser.add_argument("--output", type=Path, default=Path("benchmarks/results"))
+    parser.add_argument("--compare", nargs=2, type=Path, metavar=("BASELINE", "CURRENT"),
+                        help="Compare two result files instead of running")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    args.scenarios = [name for name in args.scenarios.split(",") if name]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+    args.concurrency = [int(level) for level in args.concurrency.split(",")]
+
+    with tempfile.TemporaryDirectory(prefix="resume-bench-") as tmp:
+        workdir = Path(tmp)
+        # Every request gets documents of its own, so extraction results are
+        # never cache hits (the job description analysis is, as in production)
+        documents = len(args.concurrency) * sum(
+            args.batches * args.batch_size if name == "batch" else args.requests
+            for name in args.scenarios
+        )
+        corpus = generate(workdir / "corpus", max(documents, 1), args.formats.split(","),
+                          args.sizes.split(","), args.seed)
+
+        processes = start_servers(args, workdir)
+        args.backend_url = f"http://127.0.0.1:{args.app_port}"
+        args.backend_pid = processes[-1].pid
+        try:
+            steps = asyncio.run(run_benchmarks(args, corpus))
+            llm_calls = httpx.get(f"http://127.0.0.1:{args.fake_port}/stats").json()
+        finally:
+            stop_servers(processes)
+
+    result = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "config": {
+                key: value for key, value in vars(args).items()
+                if key not in ("output", "compare", "backend_pid", "backend_url")
+            },
+            "llm_calls": llm_calls,
+        },
+        "steps": steps,
+    }
+    args.output.mkdir(parents=True, exist_ok=True)
+    path = args.output / f"{time.strftime('%Y%m%d-%H%M%S')}-{result['meta']['commit'] or 'local'}.json"
+    path.write_text(json.dumps(result, indent=2))
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
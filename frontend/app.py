@@ -1,19 +1,111 @@
 import streamlit as st
+import csv
+import io
 import json
-import requests
-from utils import upload_and_extract_resume, match_with_job, complete_analysis
-import os
+import time
+from utils import (
+    BACKEND_URL, backend_status, upload_and_extract_resume,
+    stream_match_with_job, complete_analysis, count_resumes, screen_resumes
+)
+
+def render_partial_match(match):
+    """Show the parts of a streaming match analysis received so far"""
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        if 'match_percentage' in match:
+            st.metric(label="Match Percentage", value=f"{match['match_percentage']}%")
+    with col2:
+        if 'verdict' in match:
+            st.metric(label="Verdict", value=str(match['verdict']).replace('_', ' '))
+    with col3:
+        if 'interview_likelihood' in match:
+            st.metric(label="Interview Likelihood", value=match['interview_likelihood'])
+    if match.get('matching_skills'):
+        st.write("**Matching skills:** " + ", ".join(map(str, match['matching_skills'])))
+    if match.get('missing_critical_requirements'):
+        st.write("**Missing requirements:** " + ", ".join(map(str, match['missing_critical_requirements'])))
+    if match.get('summary'):
+        st.write(match['summary'])
+
+def ranked_results(results):
+    """Bulk screening results, best match first (screened out, then failures, last)"""
+    def score(item):
+        value = (item[1].get('match_analysis') or {}).get('match_percentage')
+        if isinstance(value, (int, float)):
+            return value
+        return -1 if item[1].get('status') == 'screened_out' else -2
+    return sorted(results, key=score, reverse=True)
 
-# Check backend connection
-BACKEND_URL = "https://resume-matcher-api-mail.onrender.com"
+def bulk_verdict(result):
+    if result.get('status') == 'screened_out':
+        return f"Screened out (pre-screen {result['prescreen']['score']})"
+    return str((result.get('match_analysis') or {}).get('verdict') or '').replace('_', ' ')
 
-def check_backend_health():
-    """Check if backend is reachable"""
-    try:
-        response = requests.get(f"{BACKEND_URL}/health", timeout=5)
-        return response.status_code == 200
-    except:
-        return False
+def bulk_rows(results):
+    """Ranked table rows for bulk screening results"""
+    rows = []
+    for rank, (filename, result) in enumerate(ranked_results(results), 1):
+        match = result.get('match_analysis') or {}
+        contact = (result.get('resume_details') or {}).get('contact_info') or {}
+        rows.append({
+            "Rank": rank,
+            "Candidate": contact.get('name') or filename,
+            "File": filename,
+            "Match %": match.get('match_percentage'),
+            "Verdict": bulk_verdict(result),
+            "Top Missing Requirements": ", ".join(map(str, (match.get('missing_critical_requirements') or [])[:3])),
+            "Interview Likelihood": match.get('interview_likelihood') or '',
+            "Error": result.get('error', '')
+        })
+    return rows
+
+def render_bulk_table(placeholder, results):
+    placeholder.dataframe(
+        bulk_rows(results),
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            "Match %": st.column_config.ProgressColumn(
+                "Match %", min_value=0, max_value=100, format="%d%%"
+            )
+        }
+    )
+
+def bulk_csv(results):
+    """Ranked list as CSV (all missing requirements, separated by semicolons)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([
+        "rank", "candidate", "file", "candidate_id", "match_percentage", "verdict",
+        "interview_likelihood", "missing_critical_requirements", "error"
+    ])
+    for rank, (filename, result) in enumerate(ranked_results(results), 1):
+        match = result.get('match_analysis') or {}
+        contact = (result.get('resume_details') or {}).get('contact_info') or {}
+        writer.writerow([
+            rank, contact.get('name') or '', filename, result.get('candidate_id', ''),
+            match.get('match_percentage', ''), match.get('verdict', result.get('status', '')),
+            match.get('interview_likelihood', ''),
+            "; ".join(map(str, match.get('missing_critical_requirements') or [])),
+            result.get('error', '')
+        ])
+    return buffer.getvalue()
+
+def bulk_json(results):
+    """Ranked list with the full resume details and match analysis of each candidate"""
+    return json.dumps([
+        {
+            "rank": rank,
+            "file": filename,
+            "candidate_id": result.get('candidate_id'),
+            "status": result.get('status'),
+            "prescreen": result.get('prescreen'),
+            "resume_details": result.get('resume_details'),
+            "match_analysis": result.get('match_analysis'),
+            "error": result.get('error')
+        }
+        for rank, (filename, result) in enumerate(ranked_results(results), 1)
+    ], indent=2)
 
 # Page config
 st.set_page_config(
@@ -22,9 +114,12 @@ st.set_page_config(
     layout="wide"
 )
 
-# Show backend connection status
-if check_backend_health():
+# Show backend connection status (checked in the background, so this never blocks)
+healthy = backend_status()
+if healthy:
     st.sidebar.success("✅ Connected to backend")
+elif healthy is None:
+    st.sidebar.info("⏳ Checking backend connection...")
 else:
     st.sidebar.error(f"❌ Cannot connect to backend at {BACKEND_URL}")
     st.sidebar.info("The backend service might be starting up. Please wait a moment and refresh.")
@@ -84,9 +179,13 @@ if 'resume_details' not in st.session_state:
     st.session_state.resume_details = None
 if 'match_result' not in st.session_state:
     st.session_state.match_result = None
+if 'bulk_results' not in st.session_state:
+    st.session_state.bulk_results = []
 
 # Main content
-tab1, tab2, tab3 = st.tabs(["📤 Upload Resume", "🎯 Match with Job", "📊 Results"])
+tab1, tab2, tab3, tab4, tab5 = st.tabs(
+    ["📤 Upload Resume", "🎯 Match with Job", "📊 Results", "⚡ Quick Analysis", "📋 Bulk Screening"]
+)
 
 # Tab 1: Upload Resume
 with tab1:
@@ -107,7 +206,6 @@ with tab1:
             # In the upload tab, when extracting:
             if st.button("🔍 Extract Resume Details", type="primary", use_container_width=True):
                 with st.spinner("🔄 Analyzing your resume... This may take 30-60 seconds..."):
-                    import time
                     start_time = time.time()
                     result = upload_and_extract_resume(uploaded_file)
                     elapsed = time.time() - start_time
@@ -118,6 +216,10 @@ with tab1:
                     else:
                         st.session_state.resume_details = result.get('resume_details')
                         st.success(f"✅ Resume extracted successfully in {elapsed:.1f} seconds!")
+                        if result.get('timings'):
+                            st.caption("Server time: " + " · ".join(
+                                f"{stage} {ms / 1000:.2f}s" for stage, ms in result['timings'].items()
+                            ))
                         st.balloons()
         
         # Display extracted details
@@ -205,19 +307,75 @@ with tab2:
         col1, col2, col3 = st.columns([1, 1, 1])
         
         with col2:
-            if st.button("🎯 Analyze Match", type="primary", use_container_width=True, disabled=not job_description):
-                with st.spinner("Analyzing match..."):
-                    result = match_with_job(
-                        st.session_state.resume_details,
-                        job_description
-                    )
-                    
-                    if "error" in result:
-                        st.error(f"Error: {result['error']}")
-                    else:
-                        st.session_state.match_result = result.get('match_analysis')
-                        st.success("✅ Analysis complete!")
-                        st.balloons()
+            analyze_clicked = st.button("🎯 Analyze Match", type="primary", use_container_width=True, disabled=not job_description)
+        
+        if analyze_clicked:
+            # Render each part of the analysis as soon as it is generated
+            status = st.empty()
+            status.info("Analyzing match...")
+            preview = st.empty()
+            partial = {}
+            for event, data in stream_match_with_job(
+                st.session_state.resume_details,
+                job_description
+            ):
+                if event == "field":
+                    partial[data["name"]] = data["value"]
+                    with preview.container():
+                        render_partial_match(partial)
+                elif event == "result":
+                    st.session_state.match_result = data.get('match_analysis')
+                    status.success("✅ Analysis complete! See the Results tab for details.")
+                    st.balloons()
+                elif event == "error":
+                    status.error(f"Error: {data['error']}")
+
+# Tab 4: Quick Analysis (extraction and match in one request); filled in before
+# the Results tab so that tab shows its result in the same run
+with tab4:
+    st.header("⚡ Analyze a Resume in One Step")
+    st.write("Upload a resume and paste the job description: extraction and matching run in a single request.")
+    
+    quick_file = st.file_uploader(
+        "Choose a resume file",
+        type=["pdf", "docx", "txt"],
+        help="Supported formats: PDF, DOCX, TXT",
+        key="quick_file"
+    )
+    quick_job_description = st.text_area(
+        "Paste the job description here:",
+        height=250,
+        placeholder="Paste the full job description including requirements, responsibilities, and qualifications...",
+        key="quick_job_description"
+    )
+    
+    col1, col2, col3 = st.columns([1, 1, 1])
+    
+    with col2:
+        quick_clicked = st.button(
+            "⚡ Analyze",
+            type="primary",
+            use_container_width=True,
+            disabled=not (quick_file and quick_job_description)
+        )
+    
+    if quick_clicked:
+        with st.spinner("🔄 Extracting and matching... This may take 30-60 seconds..."):
+            start_time = time.time()
+            result = complete_analysis(quick_file, quick_job_description)
+            elapsed = time.time() - start_time
+        
+        if "error" in result:
+            st.error(f"Error: {result['error']}")
+        else:
+            st.session_state.resume_details = result.get('resume_details')
+            st.session_state.match_result = result.get('match_analysis')
+            st.success(f"✅ Analysis complete in {elapsed:.1f} seconds! See the Results tab for details.")
+            if result.get('timings'):
+                st.caption("Server time: " + " · ".join(
+                    f"{stage} {ms / 1000:.2f}s" for stage, ms in result['timings'].items()
+                ))
+            render_partial_match(result.get('match_analysis') or {})
 
 # Tab 3: Results
 with tab3:
@@ -326,3 +484,84 @@ with tab3:
             file_name="resume_analysis.json",
             mime="application/json"
         )
+
+# Tab 5: Bulk Screening
+with tab5:
+    st.header("📋 Screen Many Resumes at Once")
+    st.write("Upload resumes (or zip archives of resumes) and rank every candidate against one job description.")
+    
+    bulk_files = st.file_uploader(
+        "Choose resume files or zip archives",
+        type=["pdf", "docx", "txt", "zip"],
+        accept_multiple_files=True,
+        help="Supported formats: PDF, DOCX, TXT, or ZIP archives of them",
+        key="bulk_files"
+    )
+    bulk_job_description = st.text_area(
+        "Paste the job description here:",
+        height=250,
+        placeholder="Paste the full job description including requirements, responsibilities, and qualifications...",
+        key="bulk_job_description"
+    )
+    
+    col1, col2, col3 = st.columns([1, 1, 1])
+    
+    with col2:
+        bulk_clicked = st.button(
+            "📋 Screen Resumes",
+            type="primary",
+            use_container_width=True,
+            disabled=not (bulk_files and bulk_job_description)
+        )
+    
+    bulk_status = st.empty()
+    bulk_table = st.empty()
+    
+    if bulk_clicked:
+        # One /analyze-batch request: rows are added as each candidate finishes
+        total = max(count_resumes(bulk_files), 1)
+        st.session_state.bulk_results = []
+        progress = bulk_status.progress(0.0, text=f"Screening {total} resumes...")
+        start_time = time.time()
+        summary, error = None, None
+        for record in screen_resumes(bulk_files, bulk_job_description):
+            if record.get('type') == 'result':
+                st.session_state.bulk_results.append((record['filename'], record))
+                done = len(st.session_state.bulk_results)
+                progress.progress(min(done / total, 1.0), text=f"Screened {done} of {total} resumes")
+                render_bulk_table(bulk_table, st.session_state.bulk_results)
+            elif record.get('type') == 'summary':
+                summary = record
+            else:
+                error = record.get('error', 'Unknown error')
+        elapsed = time.time() - start_time
+        if error:
+            bulk_status.error(f"❌ {error}")
+        elif summary is not None:
+            message = (f"Screened {summary['total']} resumes in {elapsed:.1f} seconds: "
+                       f"{summary['succeeded']} matched, {summary['screened_out']} screened out")
+            if summary['failed']:
+                bulk_status.warning(f"{message}, {summary['failed']} failed.")
+            else:
+                bulk_status.success(f"✅ {message}.")
+    
+    if st.session_state.bulk_results:
+        render_bulk_table(bulk_table, st.session_state.bulk_results)
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button(
+                label="📥 Download Ranking (CSV)",
+                data=bulk_csv(st.session_state.bulk_results),
+                file_name="resume_ranking.csv",
+                mime="text/csv",
+                use_container_width=True
+            )
+        with col2:
+            st.download_button(
+                label="📥 Download Ranking (JSON)",
+                data=bulk_json(st.session_state.bulk_results),
+                file_name="resume_ranking.json",
+                mime="application/json",
+                use_container_width=True
+            )
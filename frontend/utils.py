@@ -1,19 +1,98 @@
 import requests
+import hashlib
+import io
+import json
 import os
+import threading
+import time
+import zipfile
+import streamlit as st
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
 
 load_dotenv()
 
 # Use environment variable with fallback for local development
 BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8000")
+# Seconds between background health checks (the status shown is at most this old)
+HEALTH_CHECK_INTERVAL = float(os.getenv("HEALTH_CHECK_INTERVAL", "15"))
+# Connections kept open to the backend
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+SUPPORTED_EXTENSIONS = ("pdf", "docx", "txt")
+MIME_TYPES = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "txt": "text/plain",
+}
+
+@st.cache_resource
+def get_session():
+    """One pooled keep-alive session to the backend, shared across reruns and users"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+class HealthMonitor:
+    """Polls the backend's /health in a daemon thread so page reruns never wait on it"""
+
+    def __init__(self, session, interval):
+        self.session = session
+        self.interval = interval
+        self.healthy = None
+        self.checked_at = None
+        self._thread = threading.Thread(target=self._run, name="backend-health", daemon=True)
+        self._thread.start()
+
+    def check(self):
+        try:
+            response = self.session.get(f"{BACKEND_URL}/health", timeout=5)
+            self.healthy = response.status_code == 200
+        except requests.exceptions.RequestException:
+            self.healthy = False
+        self.checked_at = time.time()
+
+    def _run(self):
+        while True:
+            self.check()
+            time.sleep(self.interval)
+
+@st.cache_resource
+def get_health_monitor():
+    return HealthMonitor(get_session(), HEALTH_CHECK_INTERVAL)
+
+def backend_status():
+    """Latest background health check: True, False, or None while the first check runs"""
+    return get_health_monitor().healthy
+
+def file_hash(file):
+    """SHA-256 of an uploaded file's content"""
+    return hashlib.sha256(file.getvalue()).hexdigest()
+
+def memoized(key, compute):
+    """Result of ``compute()`` remembered for this session under ``key``.
+
+    Errors are not remembered, so a failed request can be retried.
+    """
+    results = st.session_state.setdefault("memoized_results", {})
+    if key not in results:
+        result = compute()
+        if "error" in result:
+            return result
+        results[key] = result
+    return results[key]
 
 def upload_and_extract_resume(file):
-    """Upload resume file to backend and extract details"""
+    """Upload resume file to backend and extract details (once per file content)"""
+    return memoized(("extract", file_hash(file)), lambda: _upload_and_extract_resume(file))
+
+def _upload_and_extract_resume(file):
     try:
         # Reset file pointer to beginning
         file.seek(0)
         files = {"file": (file.name, file, file.type)}
-        response = requests.post(
+        response = get_session().post(
             f"{BACKEND_URL}/extract-resume", 
             files=files,
             timeout=120  # 2 minutes timeout
@@ -29,40 +108,65 @@ def upload_and_extract_resume(file):
     except Exception as e:
         return {"error": f"Unexpected error: {str(e)}"}
 
-def match_with_job(resume_details, job_description):
-    """Send resume details and job description to backend for matching"""
+def stream_match_with_job(resume_details, job_description):
+    """Stream the match from the backend as (event, data) pairs.
+
+    Yields ("field", {"name", "value"}) as each part of the analysis is
+    generated, then ("result", {...}) or ("error", {"error": ...}).
+    """
     try:
         payload = {
             "resume_details": resume_details,
             "job_description": job_description
         }
-        response = requests.post(
-            f"{BACKEND_URL}/match-job", 
+        with get_session().post(
+            f"{BACKEND_URL}/match-job/stream",
             json=payload,
-            timeout=120
-        )
-        response.raise_for_status()
-        return response.json()
+            stream=True,
+            timeout=(10, 120)  # connect, then max wait between events
+        ) as response:
+            response.raise_for_status()
+            event = None
+            for line in response.iter_lines(decode_unicode=True):
+                if line.startswith("event:"):
+                    event = line[6:].strip()
+                elif line.startswith("data:") and event:
+                    data = json.loads(line[5:])
+                    if event == "error":
+                        yield "error", {"error": data.get("detail", "Unknown error")}
+                    else:
+                        yield event, data
     except requests.exceptions.Timeout:
-        return {"error": "Request timed out. Please try again."}
+        yield "error", {"error": "Request timed out. Please try again."}
     except requests.exceptions.ConnectionError:
-        return {"error": f"Cannot connect to backend at {BACKEND_URL}"}
+        yield "error", {"error": f"Cannot connect to backend at {BACKEND_URL}"}
     except requests.exceptions.RequestException as e:
-        return {"error": f"Request error: {str(e)}"}
+        yield "error", {"error": f"Request error: {str(e)}"}
     except Exception as e:
-        return {"error": f"Unexpected error: {str(e)}"}
+        yield "error", {"error": f"Unexpected error: {str(e)}"}
 
 def complete_analysis(file, job_description):
-    """Complete analysis in one API call"""
+    """Complete analysis in one API call (once per file content and job description)"""
+    data = file.getvalue()
+    return memoized(
+        analysis_key(data, job_description),
+        lambda: analyze_resume_bytes(file.name, data, job_description)
+    )
+
+def analysis_key(data, job_description):
+    """Memo key of a complete analysis: file content and whitespace-normalized JD"""
+    jd_hash = hashlib.sha256(" ".join(job_description.split()).encode("utf-8")).hexdigest()
+    return ("analyze", hashlib.sha256(data).hexdigest(), jd_hash)
+
+def analyze_resume_bytes(filename, data, job_description):
+    """POST one resume's bytes to /analyze"""
     try:
-        # Reset file pointer to beginning
-        file.seek(0)
-        files = {"file": (file.name, file, file.type)}
-        data = {"job_description": job_description}
-        response = requests.post(
+        extension = filename.rsplit('.', 1)[-1].lower()
+        files = {"file": (filename, data, MIME_TYPES.get(extension, "application/octet-stream"))}
+        response = get_session().post(
             f"{BACKEND_URL}/analyze", 
             files=files, 
-            data=data,
+            data={"job_description": job_description},
             timeout=240  # 4 minutes for complete analysis
         )
         response.raise_for_status()
@@ -74,4 +178,63 @@ def complete_analysis(file, job_description):
     except requests.exceptions.RequestException as e:
         return {"error": f"Request error: {str(e)}"}
     except Exception as e:
-        return {"error": f"Unexpected error: {str(e)}"}
\ No newline at end of file
+        return {"error": f"Unexpected error: {str(e)}"}
+
+def count_resumes(files):
+    """Number of resumes the backend will screen from these uploads (zip archives
+    counted by their supported members, as the backend unpacks them)"""
+    total = 0
+    for file in files:
+        if not file.name.lower().endswith(".zip"):
+            total += 1
+            continue
+        try:
+            with zipfile.ZipFile(io.BytesIO(file.getvalue())) as archive:
+                total += sum(
+                    1 for info in archive.infolist()
+                    if not info.is_dir() and not info.filename.startswith("__MACOSX/")
+                    and info.filename.rsplit('.', 1)[-1].lower() in SUPPORTED_EXTENSIONS
+                )
+        except zipfile.BadZipFile:
+            pass
+    return total
+
+def screen_resumes(files, job_description):
+    """Screen many resumes (or zip archives) with one /analyze-batch request.
+
+    The backend pre-screens every candidate, analyzes the job description
+    once and queues the LLM calls behind interactive requests. Yields each
+    NDJSON record as it arrives: ``result`` records per candidate, then the
+    ``summary``, or a single ``{"type": "error"}`` record if the request fails.
+    """
+    try:
+        upload = [
+            ("files", (file.name, file.getvalue(),
+                       MIME_TYPES.get(file.name.rsplit('.', 1)[-1].lower(), "application/zip")))
+            for file in files
+        ]
+        with get_session().post(
+            f"{BACKEND_URL}/analyze-batch",
+            files=upload,
+            data={"job_description": job_description},
+            stream=True,
+            timeout=(10, 300)  # connect, then max wait between results
+        ) as response:
+            if response.status_code >= 400:
+                try:
+                    detail = response.json().get("detail", response.reason)
+                except ValueError:
+                    detail = response.reason
+                yield {"type": "error", "error": f"Backend error ({response.status_code}): {detail}"}
+                return
+            for line in response.iter_lines(decode_unicode=True):
+                if line:
+                    yield json.loads(line)
+    except requests.exceptions.Timeout:
+        yield {"type": "error", "error": "Request timed out. Please try again."}
+    except requests.exceptions.ConnectionError:
+        yield {"type": "error", "error": f"Cannot connect to backend at {BACKEND_URL}"}
+    except requests.exceptions.RequestException as e:
+        yield {"type": "error", "error": f"Request error: {str(e)}"}
+    except Exception as e:
+        yield {"type": "error", "error": f"Unexpected error: {str(e)}"}